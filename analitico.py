@@ -0,0 +1,228 @@
+import math
+import random
+from typing import Dict, Iterable, List, Optional
+from simulador import SimuladorCertificados
+
+# Grilla chica de configuraciones para comparar el estimador con el simulador
+GRILLA_VALIDACION = [
+    {'media_llegada': media, 'servicio_min': smin, 'servicio_max': smax}
+    for media in (1.5, 2, 3, 4)
+    for smin, smax in ((3, 6), (5, 8), (7, 10))
+]
+
+# Márgenes por defecto de podar(), por métrica: (relativo, absoluto). En la grilla de
+# validación el estimador sobreestima hasta un 29% los retiros y un 33% la espera (con
+# carga alta; con carga baja subestima, lo que no descarta de más). Se da un 50% para
+# cubrir configuraciones fuera de la grilla y el ruido de la propia validación, y un
+# margen absoluto para límites cercanos a cero.
+MARGENES_PODA = {
+    'porcentaje_retiros': (0.5, 1.0),
+    'tiempo_promedio_espera': (0.5, 0.5),
+}
+
+class EstimadorAnalitico:
+    """
+    Estimación analítica (instantánea) de las métricas del simulador, para descartar
+    configuraciones antes de simularlas.
+
+    Aproximación usada:
+    - Las 4 terminales y la cola de 'max_cola' lugares se tratan como una M/G/c/K
+      (c=4, K=4+max_cola), aproximada con una M/M/c/K de cola equivalente y
+      corregida en la espera por la variabilidad del servicio (Allen-Cunneen).
+    - Las rondas del técnico dejan cada terminal fuera de servicio una revisión por
+      ciclo; esa pérdida de capacidad se modela alargando el tiempo medio de servicio.
+    - Los estudiantes que se retiran vuelven una vez tras 'tiempo_regreso', lo que suma
+      un flujo de llegadas que se resuelve por punto fijo.
+    Es una estimación de régimen estacionario: con horizontes cortos el simulador
+    (que arranca vacío) da valores algo menores.
+    """
+    def __init__(self, servicio_min=5, servicio_max=8, revision_min=3, revision_max=10,
+                 ronda_min=57, ronda_max=63, media_llegada=2):
+        self.servicio_min = servicio_min
+        self.servicio_max = servicio_max
+        self.revision_min = revision_min
+        self.revision_max = revision_max
+        self.ronda_min = ronda_min
+        self.ronda_max = ronda_max
+        self.media_llegada = media_llegada
+        self.max_cola = 5           # Fijo: máximo en cola (igual que el simulador)
+        self.tiempo_regreso = 30    # Fijo: tiempo de regreso (igual que el simulador)
+        self.cantidad_terminales = 4
+
+    def _metricas_mmck(self, tasa_llegada: float, tasa_servicio: float, lugares_cola: int):
+        """Probabilidad de bloqueo y largo medio de cola de una M/M/c/K con K = c + lugares_cola"""
+        c = self.cantidad_terminales
+        a = tasa_llegada / tasa_servicio
+        pesos = [1.0]
+        for n in range(1, c + lugares_cola + 1):
+            pesos.append(pesos[-1] * a / min(n, c))
+        total = sum(pesos)
+        bloqueo = pesos[-1] / total
+        largo_cola = sum((n - c) * p for n, p in enumerate(pesos) if n > c) / total
+        return bloqueo, largo_cola
+
+    def _metricas_mgck(self, tasa_llegada: float, tasa_servicio: float, cv2_servicio: float):
+        """
+        Aproximación M/G/c/K: un servicio menos variable que el exponencial se comporta
+        como una M/M/c/K con más lugares de cola (escalados por 2/(1+cv²)). Como el
+        resultado no es entero, se interpola entre los dos tamaños de cola vecinos.
+        """
+        lugares = self.max_cola * 2 / (1 + cv2_servicio)
+        menor = math.floor(lugares)
+        fraccion = lugares - menor
+        bloqueo_1, cola_1 = self._metricas_mmck(tasa_llegada, tasa_servicio, menor)
+        bloqueo_2, cola_2 = self._metricas_mmck(tasa_llegada, tasa_servicio, menor + 1)
+        return (bloqueo_1 * (1 - fraccion) + bloqueo_2 * fraccion,
+                cola_1 * (1 - fraccion) + cola_2 * fraccion)
+
+    def estimar(self, tiempo_simulacion: Optional[float] = None, iteraciones_punto_fijo: int = 100) -> Dict:
+        """
+        Devuelve las métricas estimadas con las mismas claves que el resumen de
+        SimuladorCertificados.simular, más 'utilizacion' (fracción de tiempo que las
+        terminales atienden) y 'utilizacion_revision' (fracción en revisión).
+        Con 'tiempo_simulacion' se descuentan los regresos que caerían fuera del horizonte.
+        """
+        c = self.cantidad_terminales
+        tasa_llegada = 1 / self.media_llegada
+        media_servicio = (self.servicio_min + self.servicio_max) / 2
+        varianza_servicio = (self.servicio_max - self.servicio_min) ** 2 / 12
+        cv2_servicio = varianza_servicio / media_servicio ** 2
+        residuo_servicio = (varianza_servicio + media_servicio ** 2) / (2 * media_servicio)
+        media_revision = (self.revision_min + self.revision_max) / 2
+        media_entre_rondas = (self.ronda_min + self.ronda_max) / 2
+
+        # Fracción de los retirados cuyo regreso ocurre dentro del horizonte
+        fraccion_regreso = 1.0
+        if tiempo_simulacion is not None:
+            fraccion_regreso = max(0.0, 1 - self.tiempo_regreso / tiempo_simulacion)
+
+        prob_bloqueo = 0.0
+        ocupacion = 0.0
+        for _ in range(iteraciones_punto_fijo):
+            # Ronda: 4 revisiones, cada una esperando (si hace falta) que la terminal se libere
+            espera_tecnico = ocupacion * residuo_servicio
+            duracion_ronda = c * (media_revision + espera_tecnico)
+            ciclo = media_entre_rondas + duracion_ronda
+            fraccion_revision = media_revision / ciclo  # Por terminal
+
+            tasa_total = tasa_llegada * (1 + prob_bloqueo * fraccion_regreso)
+            tasa_servicio = (1 - fraccion_revision) / media_servicio
+            nuevo_bloqueo, largo_cola = self._metricas_mgck(tasa_total, tasa_servicio, cv2_servicio)
+            nueva_ocupacion = tasa_total * (1 - nuevo_bloqueo) * media_servicio / c
+            convergio = abs(nuevo_bloqueo - prob_bloqueo) < 1e-10 and abs(nueva_ocupacion - ocupacion) < 1e-10
+            prob_bloqueo, ocupacion = nuevo_bloqueo, nueva_ocupacion
+            if convergio:
+                break
+
+        tasa_retiros = tasa_llegada * prob_bloqueo
+        tasa_atendidos = tasa_total * (1 - prob_bloqueo)
+        porcentaje_retiros = tasa_retiros / (tasa_retiros + tasa_atendidos) * 100
+
+        espera_mm = largo_cola / tasa_atendidos if tasa_atendidos > 0 else 0.0
+        tiempo_promedio_espera = espera_mm * (1 + cv2_servicio) / 2
+
+        return {
+            'porcentaje_retiros': porcentaje_retiros,
+            'tiempo_promedio_espera': tiempo_promedio_espera,
+            'utilizacion': ocupacion,
+            'utilizacion_revision': fraccion_revision,
+            'probabilidad_bloqueo': prob_bloqueo,
+        }
+
+def estimar(parametros: Dict, tiempo_simulacion: Optional[float] = None) -> Dict:
+    """Atajo: estima las métricas para los parámetros del constructor de SimuladorCertificados"""
+    return EstimadorAnalitico(**parametros).estimar(tiempo_simulacion=tiempo_simulacion)
+
+def utilizacion_simulada(vector_estados, tiempo_final: float) -> float:
+    """Fracción del tiempo que las terminales estuvieron atendiendo, según el vector de estados"""
+    if tiempo_final <= 0:
+        return 0.0
+    acumulado = 0.0
+    anterior = None
+    for estado in vector_estados:
+        if anterior is not None:
+            ocupadas = sum(1 for t in anterior['terminales'] if t['estado'] == 'O')
+            acumulado += ocupadas * (estado['reloj'] - anterior['reloj'])
+        anterior = estado
+    return acumulado / (len(anterior['terminales']) * tiempo_final)
+
+def validar(grilla: Iterable[Dict] = GRILLA_VALIDACION, tiempo_simulacion: float = 2000.0,
+            replicas: int = 5, semilla: int = 1) -> List[Dict]:
+    """
+    Compara el estimador con el simulador (promedio de 'replicas' corridas) en cada
+    configuración de la grilla. Devuelve, por configuración, ambas métricas y el error.
+    """
+    filas = []
+    metricas = ('porcentaje_retiros', 'tiempo_promedio_espera', 'utilizacion')
+    for parametros in grilla:
+        analitico = estimar(parametros, tiempo_simulacion=tiempo_simulacion)
+        simulado = {m: 0.0 for m in metricas}
+        for replica in range(replicas):
+            random.seed(semilla + replica)
+            resultados = SimuladorCertificados(**parametros).simular(tiempo_simulacion=tiempo_simulacion,
+                                                                     max_iteraciones=10**7)
+            simulado['porcentaje_retiros'] += resultados['porcentaje_retiros'] / replicas
+            simulado['tiempo_promedio_espera'] += resultados['tiempo_promedio_espera'] / replicas
+            simulado['utilizacion'] += utilizacion_simulada(resultados['vector_estados'],
+                                                            resultados['tiempo_final']) / replicas
+        filas.append({
+            'parametros': parametros,
+            'analitico': {m: analitico[m] for m in metricas},
+            'simulado': simulado,
+            'error': {m: analitico[m] - simulado[m] for m in metricas},
+        })
+    return filas
+
+def sobreestimacion_maxima(filas: List[Dict]) -> Dict[str, float]:
+    """Mayor sobreestimación relativa (analítico / simulado - 1) por métrica en un resultado de validar()"""
+    maximos = {}
+    for metrica in filas[0]['error']:
+        relativas = [fila['analitico'][metrica] / fila['simulado'][metrica] - 1
+                     for fila in filas if fila['simulado'][metrica] > 0]
+        maximos[metrica] = max(relativas, default=0.0)
+    return maximos
+
+def podar(configuraciones: Iterable[Dict], max_porcentaje_retiros: Optional[float] = None,
+          max_tiempo_espera: Optional[float] = None, margen: Optional[float] = None,
+          tiempo_simulacion: Optional[float] = None) -> List[Dict]:
+    """
+    Filtra las configuraciones de un barrido antes de simularlas: descarta las que,
+    según la estimación analítica, superan claramente los límites indicados.
+    Una configuración se descarta solo si la estimación supera limite * (1 + relativo)
+    + absoluto, con los márgenes de MARGENES_PODA (medidos con validar()), para no
+    descartar configuraciones cercanas al límite por error de la aproximación.
+    'margen' reemplaza el margen relativo de ambas métricas.
+    """
+    def supera(estimacion: float, limite: float, metrica: str) -> bool:
+        relativo, absoluto = MARGENES_PODA[metrica]
+        if margen is not None:
+            relativo = margen
+        return estimacion > limite * (1 + relativo) + absoluto
+
+    prometedoras = []
+    for parametros in configuraciones:
+        estimacion = estimar(parametros, tiempo_simulacion=tiempo_simulacion)
+        if (max_porcentaje_retiros is not None and
+                supera(estimacion['porcentaje_retiros'], max_porcentaje_retiros, 'porcentaje_retiros')):
+            continue
+        if (max_tiempo_espera is not None and
+                supera(estimacion['tiempo_promedio_espera'], max_tiempo_espera, 'tiempo_promedio_espera')):
+            continue
+        prometedoras.append(parametros)
+    return prometedoras
+
+if __name__ == "__main__":
+    # Informe de error del estimador contra el simulador sobre la grilla de validación
+    print(f"{'media':>6} {'serv':>7} | {'%ret an':>8} {'%ret sim':>8} | {'esp an':>7} {'esp sim':>7} | {'util an':>7} {'util sim':>8}")
+    filas = validar()
+    for fila in filas:
+        p, a, s = fila['parametros'], fila['analitico'], fila['simulado']
+        print(f"{p['media_llegada']:>6} {p['servicio_min']:>3}-{p['servicio_max']:<3} | "
+              f"{a['porcentaje_retiros']:>8.2f} {s['porcentaje_retiros']:>8.2f} | "
+              f"{a['tiempo_promedio_espera']:>7.2f} {s['tiempo_promedio_espera']:>7.2f} | "
+              f"{a['utilizacion']:>7.3f} {s['utilizacion']:>8.3f}")
+    for metrica in ('porcentaje_retiros', 'tiempo_promedio_espera', 'utilizacion'):
+        errores = [abs(fila['error'][metrica]) for fila in filas]
+        print(f"Error absoluto en {metrica}: medio={sum(errores) / len(errores):.3f}, máximo={max(errores):.3f}")
+    for metrica, maximo in sobreestimacion_maxima(filas).items():
+        print(f"Sobreestimación máxima en {metrica}: {maximo:.0%}")
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import pickle
+import random
+from typing import Callable, Dict, Optional
+from simulador import SimuladorCertificados, VERSION_MOTOR
+
+# Directorio por defecto donde se guardan los resultados cacheados
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_simulaciones")
+
+class CacheResultados:
+    """
+    Caché persistente en disco de resultados de simulación.
+    Cada entrada se identifica por un hash del contenido de la configuración
+    (parámetros del modelo, semilla, horizonte y versión del motor), de modo que
+    repetir una corrida con la misma configuración devuelve el resultado guardado.
+    Se guarda un resumen (.json) y, opcionalmente, la traza (.traza.pkl) al lado.
+    Cuando el tamaño total supera el máximo se eliminan las entradas usadas hace más tiempo (LRU).
+    """
+    def __init__(self, directorio: str = DIRECTORIO_CACHE, tamano_maximo: int = 512 * 1024 * 1024):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo  # En bytes
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def clave(self, parametros: Dict, semilla: int, tiempo_simulacion: float, max_iteraciones: int) -> str:
+        """Calcula la clave de la entrada a partir de todo lo que determina el resultado"""
+        # Los parámetros numéricos se pasan a float: 2 y 2.0 son la misma configuración
+        # (la interfaz usa float y los barridos o el servidor suelen mandar enteros)
+        parametros = {k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                      for k, v in parametros.items()}
+        contenido = {
+            'parametros': parametros,
+            'semilla': semilla,
+            'tiempo_simulacion': float(tiempo_simulacion),
+            'max_iteraciones': int(max_iteraciones),
+            'version_motor': VERSION_MOTOR,
+        }
+        texto = json.dumps(contenido, sort_keys=True)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _ruta_resumen(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def _ruta_traza(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.traza.pkl")
+
+    def obtener(self, clave: str, con_traza: bool = False) -> Optional[Dict]:
+        """
+        Devuelve los resultados guardados para la clave, o None si no están.
+        Si se pide la traza y solo está guardado el resumen, se considera que no está.
+        """
+        ruta_resumen = self._ruta_resumen(clave)
+        ruta_traza = self._ruta_traza(clave)
+        if not os.path.exists(ruta_resumen):
+            return None
+        if con_traza and not os.path.exists(ruta_traza):
+            return None
+        try:
+            with open(ruta_resumen, "r", encoding="utf-8") as f:
+                resultados = json.load(f)
+            if con_traza:
+                with open(ruta_traza, "rb") as f:
+                    resultados['vector_estados'] = pickle.load(f)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            # Entrada corrupta o incompleta: se descarta y se recalcula
+            self._eliminar(clave)
+            return None
+
+        # Marcar la entrada como usada recientemente (para el LRU)
+        try:
+            os.utime(ruta_resumen, None)
+        except OSError:
+            pass  # Otro proceso la desalojó mientras tanto; el resultado leído sigue siendo válido
+        return resultados
+
+    def guardar(self, clave: str, resultados: Dict, con_traza: bool = False):
+        """Guarda los resultados bajo la clave y aplica el límite de tamaño"""
+        resumen = {k: v for k, v in resultados.items() if k != 'vector_estados'}
+        if con_traza and 'vector_estados' in resultados:
+            self._escribir(self._ruta_traza(clave), pickle.dumps(resultados['vector_estados'], protocol=pickle.HIGHEST_PROTOCOL))
+        # El resumen se escribe último: su presencia indica que la entrada está completa
+        self._escribir(self._ruta_resumen(clave), json.dumps(resumen).encode("utf-8"))
+        self.desalojar()
+
+    def _escribir(self, ruta: str, datos: bytes):
+        """Escribe el archivo de forma atómica (temporal + reemplazo)"""
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+
+    def _eliminar(self, clave: str):
+        for ruta in (self._ruta_resumen(clave), self._ruta_traza(clave)):
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+
+    def desalojar(self):
+        """Elimina las entradas menos usadas hasta que el total entre en el tamaño máximo"""
+        entradas = []
+        total = 0
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(".json"):
+                continue
+            clave = nombre[:-len(".json")]
+            ruta_resumen = self._ruta_resumen(clave)
+            ruta_traza = self._ruta_traza(clave)
+            try:
+                usado = os.path.getmtime(ruta_resumen)
+                tamano = os.path.getsize(ruta_resumen)
+                if os.path.exists(ruta_traza):
+                    tamano += os.path.getsize(ruta_traza)
+            except FileNotFoundError:
+                continue
+            entradas.append((usado, clave, tamano))
+            total += tamano
+
+        entradas.sort()  # Las usadas hace más tiempo primero
+        for usado, clave, tamano in entradas:
+            if total <= self.tamano_maximo:
+                break
+            self._eliminar(clave)
+            total -= tamano
+
+    def limpiar(self):
+        """Elimina todas las entradas de la caché"""
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".json"):
+                self._eliminar(nombre[:-len(".json")])
+
+def simular_con_cache(parametros: Dict, tiempo_simulacion: float, max_iteraciones: int = 100000,
+                      semilla: Optional[int] = 42, cache: Optional[CacheResultados] = None,
+                      con_traza: bool = True,
+                      progreso: Optional[Callable[[int, float], None]] = None) -> Dict:
+    """
+    Ejecuta la simulación con los parámetros indicados (los del constructor de
+    SimuladorCertificados), reutilizando el resultado cacheado si ya existe.
+    Sin semilla el resultado no es reproducible, por lo que no se cachea.
+    'progreso' se pasa a SimuladorCertificados.simular (no se llama si el resultado estaba cacheado).
+    Con con_traza=False el vector de estados ni siquiera se arma.
+    """
+    simulador = SimuladorCertificados(**parametros)
+    if cache is None or semilla is None:
+        if semilla is not None:
+            random.seed(semilla)
+        return simulador.simular(tiempo_simulacion=tiempo_simulacion, max_iteraciones=max_iteraciones,
+                                 progreso=progreso, guardar_traza=con_traza)
+
+    clave = cache.clave(simulador.parametros(), semilla, tiempo_simulacion, max_iteraciones)
+    resultados = cache.obtener(clave, con_traza=con_traza)
+    if resultados is not None:
+        return resultados
+
+    random.seed(semilla)
+    resultados = simulador.simular(tiempo_simulacion=tiempo_simulacion, max_iteraciones=max_iteraciones,
+                                   progreso=progreso, guardar_traza=con_traza)
+    cache.guardar(clave, resultados, con_traza=con_traza)
+    return resultados
@@ -0,0 +1,19 @@
+# Cuantil 0.975 de la t de Student para 1..30 grados de libertad
+T_975 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+         2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+         2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+def cuantil_t_975(grados: int) -> float:
+    """
+    Cuantil 0.975 de la t de Student (intervalos del 95% con pocas réplicas). Hasta 30
+    grados de libertad sale de la tabla; después, de la expansión de Cornish-Fisher
+    alrededor de la normal (error menor a 1e-4).
+    """
+    if grados < 1:
+        raise ValueError("Hacen falta al menos 1 grado de libertad")
+    if grados <= len(T_975):
+        return T_975[grados - 1]
+    z = 1.959964
+    return (z + (z ** 3 + z) / (4 * grados)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * grados ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * grados ** 3))
@@ -0,0 +1,158 @@
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from estadistica import cuantil_t_975
+from simulador import SimuladorCertificados
+
+class EstimadorEventosRaros:
+    """
+    Estimación de probabilidades de eventos raros por división de trayectorias
+    (splitting de esfuerzo fijo) sobre el largo de la cola.
+
+    Se estima la probabilidad de que, partiendo del sistema vacío, la cola llegue a
+    'nivel_objetivo' antes de 'tiempo_simulacion'. Con el objetivo por defecto
+    (max_cola + 1) el evento es "algún estudiante se retira" (llega con la cola llena);
+    con nivel_objetivo = max_cola es "la cola llega a su máximo".
+
+    El camino hasta el objetivo se parte en niveles 1, 2, ..., nivel_objetivo. En cada
+    etapa se lanzan 'esfuerzo' trayectorias desde los estados en que las de la etapa
+    anterior cruzaron su nivel (el estado del simulador se clona en el cruce) y se cuenta
+    qué fracción alcanza el siguiente. La probabilidad es el producto de esas fracciones,
+    que es un estimador insesgado. El intervalo de confianza se obtiene repitiendo el
+    procedimiento completo de forma independiente.
+    """
+    def __init__(self, parametros: Optional[Dict] = None, tiempo_simulacion: float = 120.0,
+                 nivel_objetivo: Optional[int] = None, esfuerzo: int = 200,
+                 repeticiones: int = 10, semilla: Optional[int] = None):
+        self.parametros = parametros or {}
+        self.tiempo_simulacion = tiempo_simulacion
+        self.max_cola = SimuladorCertificados(**self.parametros).max_cola
+        self.nivel_objetivo = nivel_objetivo if nivel_objetivo is not None else self.max_cola + 1
+        if not 1 <= self.nivel_objetivo <= self.max_cola + 1:
+            raise ValueError(f"El nivel objetivo debe estar entre 1 y {self.max_cola + 1}")
+        self.esfuerzo = esfuerzo
+        self.repeticiones = repeticiones
+        self.rng = random.Random(semilla)
+        self.eventos_simulados = 0  # Costo acumulado, para comparar con la fuerza bruta
+
+    def nivel(self, simulador: SimuladorCertificados) -> int:
+        """Largo de la cola, o max_cola + 1 si ya hubo algún retiro"""
+        if simulador.estudiantes_retirados > 0:
+            return simulador.max_cola + 1
+        return len(simulador.cola_estudiantes)
+
+    def _nuevo_simulador(self) -> SimuladorCertificados:
+        simulador = SimuladorCertificados(**self.parametros)
+        simulador.rng = random.Random(self.rng.getrandbits(64))
+        simulador.inicializar()
+        return simulador
+
+    def _clonar(self, simulador: SimuladorCertificados) -> SimuladorCertificados:
+        """Copia independiente del estado, con su propia secuencia de números aleatorios"""
+        return simulador.clonar(random.Random(self.rng.getrandbits(64)))
+
+    def _avanzar(self, simulador: SimuladorCertificados, umbral: int) -> bool:
+        """Simula hasta que el nivel alcanza el umbral (True) o se termina el horizonte (False)"""
+        while simulador.eventos_futuros:
+            if simulador.eventos_futuros[0].tiempo > self.tiempo_simulacion:
+                return False
+            simulador.procesar_evento(simulador.obtener_proximo_evento())
+            self.eventos_simulados += 1
+            if self.nivel(simulador) >= umbral:
+                return True
+        return False
+
+    def _una_estimacion(self) -> Tuple[float, List[float]]:
+        """Un splitting completo: devuelve la probabilidad y las condicionales por nivel"""
+        condicionales = []
+        entradas = None  # Estados en que se cruzó el nivel anterior (None: sistema vacío)
+        for umbral in range(1, self.nivel_objetivo + 1):
+            cruces = []
+            for j in range(self.esfuerzo):
+                if entradas is None:
+                    simulador = self._nuevo_simulador()
+                else:
+                    # Cada estado de entrada se usa la misma cantidad de veces (±1), en orden al azar
+                    simulador = self._clonar(entradas[j % len(entradas)])
+                if self._avanzar(simulador, umbral):
+                    cruces.append(simulador)
+            condicionales.append(len(cruces) / self.esfuerzo)
+            if not cruces:
+                # Ninguna trayectoria llegó: la estimación de esta repetición es 0
+                condicionales.extend([0.0] * (self.nivel_objetivo - umbral))
+                return 0.0, condicionales
+            self.rng.shuffle(cruces)
+            entradas = cruces
+        return math.prod(condicionales), condicionales
+
+    def estimar(self) -> Dict:
+        """
+        Devuelve la probabilidad estimada con su intervalo de confianza del 95%, el error
+        relativo, las probabilidades condicionales medias por nivel, los eventos simulados y
+        el tiempo de CPU usado.
+        """
+        self.eventos_simulados = 0
+        inicio = time.process_time()
+        estimaciones = []
+        condicionales = [0.0] * self.nivel_objetivo
+        for _ in range(self.repeticiones):
+            probabilidad, por_nivel = self._una_estimacion()
+            estimaciones.append(probabilidad)
+            condicionales = [a + b / self.repeticiones for a, b in zip(condicionales, por_nivel)]
+        return _resumir(estimaciones, self.eventos_simulados, time.process_time() - inicio,
+                        condicionales=condicionales)
+
+def estimar_fuerza_bruta(parametros: Optional[Dict] = None, tiempo_simulacion: float = 120.0,
+                         nivel_objetivo: Optional[int] = None, replicas: int = 1000,
+                         semilla: Optional[int] = None) -> Dict:
+    """
+    Misma probabilidad que EstimadorEventosRaros pero con réplicas independientes
+    (cada una corta al alcanzar el objetivo), como referencia de costo y de sesgo.
+    """
+    estimador = EstimadorEventosRaros(parametros, tiempo_simulacion, nivel_objetivo, semilla=semilla)
+    inicio = time.process_time()
+    aciertos = []
+    for _ in range(replicas):
+        simulador = estimador._nuevo_simulador()
+        aciertos.append(1.0 if estimador._avanzar(simulador, estimador.nivel_objetivo) else 0.0)
+    return _resumir(aciertos, estimador.eventos_simulados, time.process_time() - inicio)
+
+def _resumir(valores: List[float], eventos_simulados: int, tiempo_cpu: float, **extra) -> Dict:
+    """Media, intervalo de confianza del 95% (t de Student) y error relativo de valores independientes"""
+    n = len(valores)
+    media = sum(valores) / n
+    desvio = math.sqrt(sum((v - media) ** 2 for v in valores) / (n - 1)) if n > 1 else 0.0
+    semiancho = cuantil_t_975(n - 1) * desvio / math.sqrt(n) if n > 1 else 0.0
+    resumen = {
+        'probabilidad': media,
+        'ic95': (max(0.0, media - semiancho), media + semiancho),
+        'error_relativo': semiancho / media if media > 0 else float('inf'),
+        'muestras': n,
+        'eventos_simulados': eventos_simulados,
+        'tiempo_cpu': tiempo_cpu,
+    }
+    resumen.update(extra)
+    return resumen
+
+def eficiencia(resumen: Dict) -> float:
+    """Inversa de (error relativo² x segundos de CPU): mayor es mejor, comparable entre métodos"""
+    costo = resumen['error_relativo'] ** 2 * resumen['tiempo_cpu']
+    return 1 / costo if costo > 0 else float('inf')
+
+if __name__ == "__main__":
+    # Comparación en una configuración poco cargada: P(algún retiro en 2 horas)
+    parametros = {'media_llegada': 4, 'servicio_min': 5, 'servicio_max': 8}
+    splitting = EstimadorEventosRaros(parametros, tiempo_simulacion=120, esfuerzo=300,
+                                      repeticiones=10, semilla=1).estimar()
+    print(f"Splitting:     p={splitting['probabilidad']:.3e}  IC95=({splitting['ic95'][0]:.3e}, "
+          f"{splitting['ic95'][1]:.3e})  error rel.={splitting['error_relativo']:.2f}  "
+          f"eventos={splitting['eventos_simulados']}  CPU={splitting['tiempo_cpu']:.2f}s")
+    print("  Condicionales por nivel:", ", ".join(f"{p:.3f}" for p in splitting['condicionales']))
+    bruta = estimar_fuerza_bruta(parametros, tiempo_simulacion=120,
+                                 replicas=splitting['eventos_simulados'] // 60, semilla=2)
+    print(f"Fuerza bruta:  p={bruta['probabilidad']:.3e}  IC95=({bruta['ic95'][0]:.3e}, "
+          f"{bruta['ic95'][1]:.3e})  error rel.={bruta['error_relativo']:.2f}  "
+          f"eventos={bruta['eventos_simulados']}  CPU={bruta['tiempo_cpu']:.2f}s")
+    print(f"Eficiencia por segundo de CPU (splitting / fuerza bruta): "
+          f"{eficiencia(splitting) / eficiencia(bruta):.1f}x")
@@ -0,0 +1,320 @@
+import bisect
+import tkinter as tk
+from array import array
+from tkinter import ttk
+from typing import Dict, List, Sequence, Tuple
+
+def lttb(xs: Sequence[float], ys: Sequence[float], umbral: int) -> Tuple[List[float], List[float]]:
+    """
+    Reduce la serie a 'umbral' puntos con Largest-Triangle-Three-Buckets: de cada
+    cubeta se conserva el punto que forma el triángulo más grande con el punto elegido
+    en la cubeta anterior y el promedio de la siguiente. Mantiene la forma de la curva.
+    """
+    n = len(xs)
+    if umbral >= n or umbral < 3:
+        return list(xs), list(ys)
+
+    tamano = (n - 2) / (umbral - 2)
+    salida_x = [xs[0]]
+    salida_y = [ys[0]]
+    elegido = 0
+    for i in range(umbral - 2):
+        # Promedio de la cubeta siguiente
+        inicio_sig = int((i + 1) * tamano) + 1
+        fin_sig = min(int((i + 2) * tamano) + 1, n)
+        cantidad = fin_sig - inicio_sig
+        prom_x = sum(xs[inicio_sig:fin_sig]) / cantidad
+        prom_y = sum(ys[inicio_sig:fin_sig]) / cantidad
+
+        # Punto de la cubeta actual con mayor área
+        inicio = int(i * tamano) + 1
+        fin = int((i + 1) * tamano) + 1
+        ax, ay = xs[elegido], ys[elegido]
+        mayor_area = -1.0
+        for j in range(inicio, fin):
+            area = abs((ax - prom_x) * (ys[j] - ay) - (ax - xs[j]) * (prom_y - ay))
+            if area > mayor_area:
+                mayor_area = area
+                elegido_cubeta = j
+        elegido = elegido_cubeta
+        salida_x.append(xs[elegido])
+        salida_y.append(ys[elegido])
+
+    salida_x.append(xs[-1])
+    salida_y.append(ys[-1])
+    return salida_x, salida_y
+
+def minmax(xs: Sequence[float], ys: Sequence[float], cubetas: int) -> Tuple[List[float], List[float]]:
+    """
+    Reduce la serie conservando, por cubeta, el mínimo y el máximo (en el orden en que
+    ocurren). Deja a lo sumo 2*cubetas puntos y no pierde picos, por eso conviene para
+    series escalonadas como el largo de cola.
+    """
+    n = len(xs)
+    if n <= 2 * cubetas or cubetas < 1:
+        return list(xs), list(ys)
+
+    tamano = n / cubetas
+    salida_x, salida_y = [], []
+    for i in range(cubetas):
+        inicio = int(i * tamano)
+        fin = min(int((i + 1) * tamano), n)
+        if inicio >= fin:
+            continue
+        j_min = j_max = inicio
+        for j in range(inicio + 1, fin):
+            if ys[j] < ys[j_min]:
+                j_min = j
+            elif ys[j] > ys[j_max]:
+                j_max = j
+        for j in sorted({j_min, j_max}):
+            salida_x.append(xs[j])
+            salida_y.append(ys[j])
+    return salida_x, salida_y
+
+class PiramideMinMax:
+    """
+    Índices del mínimo y del máximo de una serie por bloques de 16, 32, 64, ... puntos,
+    calculados una sola vez al cargar la traza. Reducir un rango de n puntos a c cubetas
+    cuesta así O(c) y no O(n): se toman los bloques del nivel cuyo tamaño se acerca a n/c
+    y solo se recorren los bordes que no llegan a completar un bloque.
+    """
+    BLOQUE_BASE = 16
+
+    def __init__(self, ys: Sequence[float]):
+        self.ys = ys
+        self.niveles = []  # (tamaño de bloque, índices de los mínimos, índices de los máximos)
+        tamano = self.BLOQUE_BASE
+        if len(ys) < 2 * tamano:
+            return
+        minimos, maximos = array('q'), array('q')
+        for inicio in range(0, len(ys), tamano):
+            bloque = ys[inicio:inicio + tamano]
+            minimos.append(inicio + bloque.index(min(bloque)))
+            maximos.append(inicio + bloque.index(max(bloque)))
+        self.niveles.append((tamano, minimos, maximos))
+        while len(minimos) > 1:
+            # Cada bloque del nivel siguiente junta dos; ante empates queda el primero, como en minmax()
+            tamano *= 2
+            nuevos_min, nuevos_max = array('q'), array('q')
+            for i in range(0, len(minimos), 2):
+                a, b = minimos[i], minimos[min(i + 1, len(minimos) - 1)]
+                nuevos_min.append(a if ys[a] <= ys[b] else b)
+                a, b = maximos[i], maximos[min(i + 1, len(maximos) - 1)]
+                nuevos_max.append(a if ys[a] >= ys[b] else b)
+            minimos, maximos = nuevos_min, nuevos_max
+            self.niveles.append((tamano, minimos, maximos))
+
+    def _extremos(self, desde: int, hasta: int) -> List[int]:
+        """Índices (ordenados) del mínimo y el máximo en [desde, hasta), recorriendo la serie"""
+        if desde >= hasta:
+            return []
+        tramo = self.ys[desde:hasta]
+        return sorted({desde + tramo.index(min(tramo)), desde + tramo.index(max(tramo))})
+
+    def reducir(self, xs: Sequence[float], inicio: int, fin: int, cubetas: int) -> Tuple[List[float], List[float]]:
+        """
+        Reduce los puntos [inicio, fin) conservando el mínimo y el máximo de cada bloque, con
+        entre 'cubetas' y 2*cubetas bloques (a lo sumo unos 4*cubetas puntos). 'xs' es la
+        serie de tiempos, que no hace falta para armar la pirámide.
+        """
+        n = fin - inicio
+        if n <= 2 * cubetas or cubetas < 1:
+            return list(xs[inicio:fin]), list(self.ys[inicio:fin])
+        nivel = None
+        for tamano, minimos, maximos in self.niveles:
+            if tamano * cubetas > n:
+                break
+            nivel = (tamano, minimos, maximos)
+        if nivel is None:
+            # Rango chico (menos de BLOQUE_BASE puntos por cubeta): se reduce directamente
+            return minmax(xs[inicio:fin], self.ys[inicio:fin], cubetas)
+
+        tamano, minimos, maximos = nivel
+        primero = -(-inicio // tamano)  # Bloques completos dentro del rango: [primero, ultimo)
+        ultimo = fin // tamano
+        indices = self._extremos(inicio, min(fin, primero * tamano))
+        for b in range(primero, ultimo):
+            j_min, j_max = minimos[b], maximos[b]
+            if j_min == j_max:
+                indices.append(j_min)
+            else:
+                indices.extend((j_min, j_max) if j_min < j_max else (j_max, j_min))
+        indices.extend(self._extremos(max(primero, ultimo) * tamano, fin))
+        ys = self.ys
+        return [xs[j] for j in indices], [ys[j] for j in indices]
+
+def extraer_series(vector_estados) -> Dict[str, List[float]]:
+    """Arma las series a graficar (contra 'reloj') a partir del vector de estados"""
+    series = {'reloj': [], 'cola': [], 'ocupadas': [], 'tecnico': [], 'promedio_espera': []}
+    for estado in vector_estados:
+        series['reloj'].append(estado['reloj'])
+        series['cola'].append(estado['cola_length'])
+        series['ocupadas'].append(sum(1 for t in estado['terminales'] if t['estado'] == 'O'))
+        # Técnico: 1 revisando, 0.5 en ronda esperando una terminal, 0 disponible
+        if estado['tecnico']['estado'] == 'R':
+            series['tecnico'].append(1)
+        elif estado.get('pendientes_revision'):
+            series['tecnico'].append(0.5)
+        else:
+            series['tecnico'].append(0)
+        series['promedio_espera'].append(estado['tiempo_promedio_espera'])
+    return series
+
+# Series del panel: (clave, título, color, método de reducción)
+SERIES_PANEL = [
+    ('cola', "Largo de cola", "#1f77b4", minmax),
+    ('ocupadas', "Terminales ocupadas", "#2ca02c", minmax),
+    ('tecnico', "Técnico (0=D, 0.5=esperando, 1=R)", "#d62728", minmax),
+    ('promedio_espera', "Prom. espera (min)", "#9467bd", lttb),
+]
+
+class PanelGraficos(ttk.Frame):
+    """
+    Panel con gráficos de las series principales contra el reloj.
+    Solo se dibujan unos pocos puntos por píxel de ancho: al cargar se arma una pirámide
+    de min/max por serie, y cada redibujo toma de ella los bloques del rango visible (la
+    serie de promedios se preselecciona así y después se reduce con LTTB). El costo de
+    redibujar depende del ancho y no de la cantidad de puntos visibles.
+    Rueda del mouse: zoom alrededor del cursor. Arrastrar: desplazar. Doble clic: ver todo.
+    """
+    MARGEN_IZQ = 60
+    MARGEN_DER = 15
+    MARGEN_SUP = 10
+    MARGEN_INF = 25
+    SEPARACION = 18
+    DEMORA_REDIBUJO = 50  # ms: los <Configure> seguidos (al redimensionar) se agrupan
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.canvas = tk.Canvas(self, background="white", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.series = None
+        self.piramides = {}  # clave de serie -> PiramideMinMax
+        self.vista = None  # (reloj_desde, reloj_hasta)
+        self._arrastre = None
+        self._redibujo_pendiente = None
+
+        self.canvas.bind("<Configure>", lambda e: self._programar_redibujo())
+        self.canvas.bind("<MouseWheel>", lambda e: self._zoom(e.x, 0.8 if e.delta > 0 else 1.25))
+        self.canvas.bind("<Button-4>", lambda e: self._zoom(e.x, 0.8))
+        self.canvas.bind("<Button-5>", lambda e: self._zoom(e.x, 1.25))
+        self.canvas.bind("<ButtonPress-1>", self._iniciar_arrastre)
+        self.canvas.bind("<B1-Motion>", self._arrastrar)
+        self.canvas.bind("<Double-Button-1>", lambda e: self._ver_todo())
+
+    def cargar(self, vector_estados):
+        """Carga una nueva traza y la muestra completa"""
+        self.series = extraer_series(vector_estados)
+        self.piramides = {clave: PiramideMinMax(self.series[clave]) for clave, _, _, _ in SERIES_PANEL}
+        self._ver_todo()
+
+    def _programar_redibujo(self):
+        """Redibuja una sola vez al final de una ráfaga de eventos (cada uno reprograma)"""
+        if self._redibujo_pendiente is not None:
+            self.after_cancel(self._redibujo_pendiente)
+        self._redibujo_pendiente = self.after(self.DEMORA_REDIBUJO, self._redibujo_programado)
+
+    def _redibujo_programado(self):
+        self._redibujo_pendiente = None
+        self.redibujar()
+
+    def _ver_todo(self):
+        if not self.series or not self.series['reloj']:
+            return
+        reloj = self.series['reloj']
+        self.vista = (reloj[0], max(reloj[-1], reloj[0] + 1e-9))
+        self.redibujar()
+
+    def _ancho_util(self) -> int:
+        return max(1, self.canvas.winfo_width() - self.MARGEN_IZQ - self.MARGEN_DER)
+
+    def _reloj_en(self, x: float) -> float:
+        desde, hasta = self.vista
+        return desde + (x - self.MARGEN_IZQ) / self._ancho_util() * (hasta - desde)
+
+    def _zoom(self, x, factor):
+        if self.vista is None:
+            return
+        desde, hasta = self.vista
+        centro = self._reloj_en(x)
+        self.vista = (centro - (centro - desde) * factor, centro + (hasta - centro) * factor)
+        self.redibujar()
+
+    def _iniciar_arrastre(self, event):
+        self._arrastre = (event.x, self.vista) if self.vista is not None else None
+
+    def _arrastrar(self, event):
+        if self._arrastre is None:
+            return
+        x_inicial, (desde, hasta) = self._arrastre
+        desplazamiento = (event.x - x_inicial) / self._ancho_util() * (hasta - desde)
+        self.vista = (desde - desplazamiento, hasta - desplazamiento)
+        self.redibujar()
+
+    def redibujar(self):
+        """Dibuja las series en el rango visible, reducidas al ancho disponible"""
+        self.canvas.delete("all")
+        if not self.series or self.vista is None:
+            return
+        ancho = self.canvas.winfo_width()
+        alto = self.canvas.winfo_height()
+        ancho_util = self._ancho_util()
+        alto_grafico = (alto - self.MARGEN_SUP - self.MARGEN_INF) / len(SERIES_PANEL) - self.SEPARACION
+        if alto_grafico <= 10:
+            return
+
+        desde, hasta = self.vista
+        reloj = self.series['reloj']
+        # Un punto antes y uno después del rango, para que las líneas lleguen a los bordes
+        inicio = max(0, bisect.bisect_left(reloj, desde) - 1)
+        fin = min(len(reloj), bisect.bisect_right(reloj, hasta) + 1)
+        textos = []  # Se dibujan al final, por encima del recorte
+
+        for k, (clave, titulo, color, reducir) in enumerate(SERIES_PANEL):
+            y_sup = self.MARGEN_SUP + k * (alto_grafico + self.SEPARACION) + self.SEPARACION
+            y_inf = y_sup + alto_grafico
+            self.canvas.create_rectangle(self.MARGEN_IZQ, y_sup, ancho - self.MARGEN_DER, y_inf, outline="#bbbbbb")
+            textos.append((self.MARGEN_IZQ + 4, y_sup - 2, titulo, "sw"))
+
+            if inicio >= fin:
+                continue
+            piramide = self.piramides[clave]
+            if reducir is lttb:
+                # Preselección min/max (unos 4 puntos por píxel) y LTTB sobre lo que queda
+                xs, ys = piramide.reducir(reloj, inicio, fin, 2 * ancho_util)
+                xs, ys = lttb(xs, ys, ancho_util)
+            else:
+                xs, ys = piramide.reducir(reloj, inicio, fin, max(1, ancho_util // 2))
+
+            y_min = min(0, min(ys))
+            y_max = max(ys)
+            if y_max <= y_min:
+                y_max = y_min + 1
+            textos.append((self.MARGEN_IZQ - 4, y_sup, f"{y_max:g}", "ne"))
+            textos.append((self.MARGEN_IZQ - 4, y_inf, f"{y_min:g}", "se"))
+
+            escala_x = ancho_util / (hasta - desde)
+            escala_y = alto_grafico / (y_max - y_min)
+            # Las series de min/max son escalonadas (el valor se mantiene hasta el próximo
+            # evento): se dibujan con escalones en vez de rectas entre eventos
+            escalonada = reducir is minmax
+            coordenadas = []
+            for x, y in zip(xs, ys):
+                px = self.MARGEN_IZQ + (x - desde) * escala_x
+                py = y_inf - (y - y_min) * escala_y
+                if escalonada and coordenadas:
+                    coordenadas.extend((px, coordenadas[-1]))
+                coordenadas.extend((px, py))
+            if len(coordenadas) >= 4:
+                self.canvas.create_line(*coordenadas, fill=color)
+
+        # Recorte de las líneas que caen fuera del área de gráficos al desplazar
+        self.canvas.create_rectangle(0, 0, self.MARGEN_IZQ - 1, alto, fill="white", outline="")
+        self.canvas.create_rectangle(ancho - self.MARGEN_DER + 1, 0, ancho, alto, fill="white", outline="")
+
+        textos.append((self.MARGEN_IZQ, alto - 4, f"{desde:.2f}", "sw"))
+        textos.append((ancho - self.MARGEN_DER, alto - 4, f"{hasta:.2f}", "se"))
+        textos.append((ancho / 2, alto - 4, "Reloj (min)", "s"))
+        for x, y, texto, ancla in textos:
+            self.canvas.create_text(x, y, text=texto, anchor=ancla, font=("TkDefaultFont", 8))
@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import collections
+import functools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from cache import CacheResultados, DIRECTORIO_CACHE, simular_con_cache
+from estadistica import cuantil_t_975
+
+HOST_POR_DEFECTO = "127.0.0.1"
+PUERTO_POR_DEFECTO = 8766
+
+# Protocolo coordinador <-> trabajador: un mensaje JSON por línea.
+#   Trabajador -> coordinador: {"tipo": "pedir"}, {"tipo": "resultado", "indice": i, "resumen": {...}},
+#                              {"tipo": "error", "indice": i, "mensaje": "..."}
+#   Coordinador -> trabajador: {"tipo": "unidad", ...unidad de trabajo...}, {"tipo": "fin"}
+# Cada conexión tiene a lo sumo una unidad asignada; si se corta, la unidad se reasigna.
+# Una unidad que falla al ejecutarse falla igual en cualquier nodo (misma configuración y
+# semilla), así que un error no se reasigna: termina el estudio.
+
+# Métricas del resumen que se agregan entre réplicas
+METRICAS = ('porcentaje_retiros', 'tiempo_promedio_espera', 'estudiantes_atendidos', 'estudiantes_retirados')
+
+class UnidadFallida(Exception):
+    """Una unidad de trabajo lanzó una excepción en un trabajador"""
+
+def crear_unidades(configuraciones: Iterable[Dict], replicas: int, tiempo_simulacion: float,
+                   max_iteraciones: int = 100000, semilla_base: int = 1) -> List[Dict]:
+    """
+    Arma las unidades de trabajo: una por (configuración, réplica). La réplica r usa la
+    semilla semilla_base + r en todas las configuraciones (números aleatorios comunes),
+    así el resultado depende solo de las unidades y no de quién las ejecuta.
+    """
+    unidades = []
+    for numero_config, parametros in enumerate(configuraciones):
+        for replica in range(replicas):
+            unidades.append({
+                'indice': len(unidades),
+                'configuracion': numero_config,
+                'parametros': parametros,
+                'replica': replica,
+                'semilla': semilla_base + replica,
+                'tiempo_simulacion': tiempo_simulacion,
+                'max_iteraciones': max_iteraciones,
+            })
+    return unidades
+
+def ejecutar_unidad(unidad: Dict, directorio_cache: Optional[str] = None) -> Dict:
+    """Ejecuta una unidad de trabajo y devuelve solo el resumen"""
+    cache = CacheResultados(directorio_cache) if directorio_cache else None
+    return simular_con_cache(unidad['parametros'], unidad['tiempo_simulacion'], unidad['max_iteraciones'],
+                             semilla=unidad['semilla'], cache=cache, con_traza=False)
+
+def agregar(unidades: List[Dict], resumenes: Dict[int, Dict]) -> List[Dict]:
+    """
+    Agrega los resúmenes por configuración: media, desvío e intervalo de confianza del 95%
+    (t de Student, n-1 grados de libertad) de cada métrica. Se suma siempre en el orden
+    de las unidades, de modo que el resultado es idéntico sin importar en qué orden o en
+    qué nodo se ejecutaron.
+    """
+    por_configuracion = collections.OrderedDict()
+    for unidad in unidades:
+        por_configuracion.setdefault(unidad['configuracion'], (unidad['parametros'], []))[1].append(
+            resumenes[unidad['indice']])
+
+    agregado = []
+    for numero_config, (parametros, lista) in por_configuracion.items():
+        n = len(lista)
+        fila = {'configuracion': numero_config, 'parametros': parametros, 'replicas': n}
+        for metrica in METRICAS:
+            valores = [r[metrica] for r in lista]
+            media = sum(valores) / n
+            desvio = math.sqrt(sum((v - media) ** 2 for v in valores) / (n - 1)) if n > 1 else 0.0
+            semiancho = cuantil_t_975(n - 1) * desvio / math.sqrt(n) if n > 1 else 0.0
+            fila[metrica] = {'media': media, 'desvio': desvio, 'ic95': (media - semiancho, media + semiancho)}
+        agregado.append(fila)
+    return agregado
+
+def ejecutar_local(unidades: List[Dict], procesos: Optional[int] = None,
+                   directorio_cache: Optional[str] = None) -> List[Dict]:
+    """Ejecuta todas las unidades en esta máquina (referencia de un solo nodo) y las agrega"""
+    funcion = functools.partial(ejecutar_unidad, directorio_cache=directorio_cache)
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        resumenes = dict(zip((u['indice'] for u in unidades), pool.map(funcion, unidades)))
+    return agregar(unidades, resumenes)
+
+class Coordinador:
+    """
+    Reparte unidades de trabajo a trabajadores conectados por TCP y junta sus resúmenes.
+    Si una conexión se corta, o una unidad tarda más que 'limite_unidad' segundos, la
+    unidad vuelve a la cola para otro trabajador (si llegan dos resultados para la misma
+    unidad son idénticos, y se usa el primero). Si un trabajador informa un error, el
+    estudio se corta y ejecutar() lanza UnidadFallida.
+    """
+    def __init__(self, unidades: List[Dict], host: str = HOST_POR_DEFECTO, puerto: int = PUERTO_POR_DEFECTO,
+                 limite_unidad: Optional[float] = None):
+        self.unidades = {u['indice']: u for u in unidades}
+        self.host = host
+        self.puerto = puerto  # Con 0 se elige un puerto libre; se actualiza al iniciar
+        self.limite_unidad = limite_unidad
+
+        self.resumenes: Dict[int, Dict] = {}
+        self.error: Optional[str] = None  # Primer error informado por un trabajador
+        self._pendientes = collections.deque(self.unidades)
+        self._asignadas = {}  # (indice, tarea que la atiende) -> momento de asignación
+        self._conexiones = {}  # tarea que atiende al trabajador -> su StreamWriter
+        self._servidor = None
+
+    async def iniciar(self):
+        self._hay_trabajo = asyncio.Condition()
+        self._terminado = asyncio.Event()
+        if not self._pendientes:
+            self._terminado.set()
+        self._servidor = await asyncio.start_server(self._atender_trabajador, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+
+    async def ejecutar(self) -> List[Dict]:
+        """Espera a que todas las unidades tengan resultado y devuelve el agregado (UnidadFallida si alguna falló)"""
+        if self._servidor is None:
+            await self.iniciar()
+        vigilancia = asyncio.create_task(self._vigilar_demoras()) if self.limite_unidad else None
+        try:
+            await self._terminado.wait()
+        finally:
+            if vigilancia is not None:
+                vigilancia.cancel()
+            self._servidor.close()
+            async with self._hay_trabajo:
+                self._hay_trabajo.notify_all()  # Los trabajadores en espera reciben 'fin'
+            if self._conexiones:
+                # Se les da un momento para recibir 'fin'; los que siguen ocupados se cortan
+                await asyncio.wait(list(self._conexiones), timeout=1.0)
+                for escritor in list(self._conexiones.values()):
+                    escritor.close()
+            await self._servidor.wait_closed()
+        if self.error is not None:
+            raise UnidadFallida(self.error)
+        unidades = [self.unidades[i] for i in sorted(self.unidades)]
+        return agregar(unidades, self.resumenes)
+
+    async def _finalizar(self):
+        """Termina el estudio: los trabajadores en espera reciben 'fin'"""
+        self._terminado.set()
+        async with self._hay_trabajo:
+            self._hay_trabajo.notify_all()
+
+    async def _reencolar(self, indice: int, tarea: asyncio.Task):
+        """Devuelve a la cola una unidad asignada a 'tarea', si todavía no tiene resultado"""
+        self._asignadas.pop((indice, tarea), None)
+        if indice not in self.resumenes and indice not in self._pendientes:
+            self._pendientes.appendleft(indice)
+            async with self._hay_trabajo:
+                self._hay_trabajo.notify()
+
+    async def _proxima_unidad(self, tarea: asyncio.Task) -> Optional[int]:
+        """Espera una unidad pendiente y la asigna a 'tarea'; devuelve None cuando ya no queda trabajo"""
+        async with self._hay_trabajo:
+            while True:
+                if self._terminado.is_set():
+                    return None
+                while self._pendientes:
+                    indice = self._pendientes.popleft()
+                    if indice not in self.resumenes:
+                        self._asignadas[(indice, tarea)] = time.monotonic()
+                        return indice
+                await self._hay_trabajo.wait()
+
+    async def _vigilar_demoras(self):
+        """Reasigna las unidades que superan el tiempo límite"""
+        while True:
+            await asyncio.sleep(min(1.0, self.limite_unidad))
+            ahora = time.monotonic()
+            for (indice, tarea), asignada in list(self._asignadas.items()):
+                if ahora - asignada > self.limite_unidad:
+                    await self._reencolar(indice, tarea)
+
+    async def _atender_trabajador(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        tarea = asyncio.current_task()
+        self._conexiones[tarea] = escritor
+        asignada = None
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                mensaje = json.loads(linea)
+                if mensaje.get('tipo') in ('resultado', 'error'):
+                    indice = mensaje.get('indice')
+                    if asignada is None or indice != asignada:
+                        # Índice ajeno a esta conexión (inventado o ya entregado): se ignora
+                        continue
+                    if mensaje['tipo'] == 'resultado' and not isinstance(mensaje.get('resumen'), dict):
+                        raise ValueError("Resultado sin resumen")  # Se corta y la unidad vuelve a la cola
+                    # Solo la asignación propia: si la unidad se reasignó, la otra sigue vigente
+                    self._asignadas.pop((indice, tarea), None)
+                    asignada = None
+                    if mensaje['tipo'] == 'error':
+                        if self.error is None:
+                            self.error = f"Unidad {indice} ({self.unidades[indice]['parametros']}): {mensaje.get('mensaje')}"
+                        await self._finalizar()
+                        continue
+                    self.resumenes.setdefault(indice, mensaje['resumen'])
+                    if len(self.resumenes) == len(self.unidades):
+                        await self._finalizar()
+                elif mensaje.get('tipo') == 'pedir':
+                    asignada = await self._proxima_unidad(tarea)
+                    if asignada is None:
+                        escritor.write(b'{"tipo": "fin"}\n')
+                        await escritor.drain()
+                        break
+                    respuesta = dict(self.unidades[asignada], tipo='unidad')
+                    escritor.write((json.dumps(respuesta) + "\n").encode("utf-8"))
+                    await escritor.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            # Trabajador perdido (o que mandó basura): su unidad vuelve a la cola
+            if asignada is not None and asignada not in self.resumenes:
+                await self._reencolar(asignada, tarea)
+            self._asignadas.pop((asignada, tarea), None)
+            self._conexiones.pop(tarea, None)
+            escritor.close()
+
+async def ejecutar_trabajador(host: str = HOST_POR_DEFECTO, puerto: int = PUERTO_POR_DEFECTO,
+                              procesos: Optional[int] = None, directorio_cache: Optional[str] = DIRECTORIO_CACHE,
+                              reintentos: int = 30) -> int:
+    """
+    Se conecta al coordinador con una conexión por proceso y ejecuta unidades hasta
+    recibir 'fin'. Devuelve la cantidad de unidades ejecutadas.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    funcion = functools.partial(ejecutar_unidad, directorio_cache=directorio_cache)
+
+    async def conectar():
+        for intento in range(reintentos + 1):
+            try:
+                return await asyncio.open_connection(host, puerto)
+            except OSError:
+                if intento == reintentos:
+                    raise
+                await asyncio.sleep(1)
+
+    async def ranura(pool) -> int:
+        lector, escritor = await conectar()
+        ejecutadas = 0
+        try:
+            while True:
+                escritor.write(b'{"tipo": "pedir"}\n')
+                await escritor.drain()
+                linea = await lector.readline()
+                if not linea:
+                    break
+                mensaje = json.loads(linea)
+                if mensaje.get('tipo') != 'unidad':
+                    break
+                try:
+                    resumen = await loop.run_in_executor(pool, funcion, mensaje)
+                    respuesta = {'tipo': 'resultado', 'indice': mensaje['indice'], 'resumen': resumen}
+                    ejecutadas += 1
+                except Exception as e:
+                    # Se informa al coordinador; el trabajador sigue disponible
+                    respuesta = {'tipo': 'error', 'indice': mensaje['indice'],
+                                 'mensaje': f"{type(e).__name__}: {e}"}
+                escritor.write((json.dumps(respuesta) + "\n").encode("utf-8"))
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+        return ejecutadas
+
+    # 'spawn' evita que los procesos hereden los sockets: si este trabajador muere,
+    # sus conexiones se cierran y el coordinador reasigna las unidades enseguida
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        return sum(await asyncio.gather(*(ranura(pool) for _ in range(procesos))))
+
+def _main():
+    parser = argparse.ArgumentParser(description="Granja de réplicas: coordinador y trabajadores por TCP")
+    sub = parser.add_subparsers(dest="modo", required=True)
+
+    coord = sub.add_parser("coordinador", help="Reparte las unidades y agrega los resultados")
+    coord.add_argument("--host", default="0.0.0.0")
+    coord.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    coord.add_argument("--configuraciones", help="Archivo JSON con una lista de parámetros del simulador")
+    coord.add_argument("--replicas", type=int, default=30)
+    coord.add_argument("--tiempo", type=float, default=120.0, help="Tiempo de simulación de cada réplica (min)")
+    coord.add_argument("--max-iteraciones", type=int, default=100000)
+    coord.add_argument("--semilla", type=int, default=1, help="Semilla de la primera réplica")
+    coord.add_argument("--limite-unidad", type=float, default=None, help="Segundos antes de reasignar una unidad (cubre nodos que se cuelgan sin cortar la conexión)")
+    coord.add_argument("--salida", help="Archivo donde guardar el agregado (por defecto, la salida estándar)")
+
+    trab = sub.add_parser("trabajador", help="Ejecuta unidades pedidas al coordinador")
+    trab.add_argument("--host", default=HOST_POR_DEFECTO)
+    trab.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    trab.add_argument("--procesos", type=int, default=None, help="Procesos en este nodo (por defecto, uno por CPU)")
+    trab.add_argument("--sin-cache", action="store_true", help="No usar la caché de resultados")
+    args = parser.parse_args()
+
+    if args.modo == "coordinador":
+        configuraciones = [{}]
+        if args.configuraciones:
+            with open(args.configuraciones, "r", encoding="utf-8") as f:
+                configuraciones = json.load(f)
+        unidades = crear_unidades(configuraciones, args.replicas, args.tiempo,
+                                  args.max_iteraciones, args.semilla)
+        coordinador = Coordinador(unidades, args.host, args.puerto, args.limite_unidad)
+        print(f"Coordinador en {args.host}:{args.puerto}, {len(unidades)} unidades", file=sys.stderr)
+        try:
+            agregado = asyncio.run(coordinador.ejecutar())
+        except UnidadFallida as e:
+            sys.exit(f"Estudio interrumpido: {e}")
+        texto = json.dumps(agregado, indent=2)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                f.write(texto)
+        else:
+            print(texto)
+    else:
+        ejecutadas = asyncio.run(ejecutar_trabajador(args.host, args.puerto, args.procesos,
+                                                     None if args.sin_cache else DIRECTORIO_CACHE))
+        print(f"Trabajador finalizado: {ejecutadas} unidades ejecutadas", file=sys.stderr)
+
+if __name__ == "__main__":
+    _main()
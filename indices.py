@@ -0,0 +1,104 @@
+import bisect
+import heapq
+import operator
+import re
+from typing import Dict, List, Optional
+
+# Operadores de comparación admitidos en las consultas sobre el largo de cola
+OPERADORES = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+    '=': operator.eq,
+    '==': operator.eq,
+}
+
+PATRON_COLA = re.compile(r"^cola\s*(>=|<=|==|>|<|=)\s*(\d+)$")
+
+class IndiceTraza:
+    """
+    Índices sobre el vector de estados para encontrar iteraciones sin recorrer la traza.
+    Se construyen una sola vez (un recorrido) y cada consulta devuelve la lista ordenada
+    de iteraciones que cumplen la condición.
+
+    Consultas admitidas:
+      evento:<tipo>         iteraciones de ese tipo de evento (ej. evento:regreso_estudiante)
+      cola<op><n>           largo de cola comparado con n (ej. cola>=5, cola=0)
+      estudiante:<id>       iteraciones en que el estudiante aparece, cambia o sale del sistema
+      tecnico:<estado>      R (revisando), D (disponible) o 'bloqueado' (en ronda, esperando
+                            que se libere una terminal pendiente)
+    """
+    def __init__(self, vector_estados):
+        self.por_evento: Dict[str, List[int]] = {}
+        self.por_largo_cola: Dict[int, List[int]] = {}
+        self.por_estudiante: Dict[int, List[int]] = {}
+        self.por_estado_tecnico: Dict[str, List[int]] = {}
+        self._consultas = {}  # Resultados ya calculados (consulta normalizada -> iteraciones)
+
+        estudiantes_anteriores = {}
+        cantidad = 0
+        for i, estado in enumerate(vector_estados):
+            self.por_evento.setdefault(estado['evento'], []).append(i)
+            self.por_largo_cola.setdefault(estado['cola_length'], []).append(i)
+
+            estado_tecnico = estado['tecnico']['estado']
+            self.por_estado_tecnico.setdefault(estado_tecnico, []).append(i)
+            if estado_tecnico == 'D' and estado.get('pendientes_revision'):
+                self.por_estado_tecnico.setdefault('bloqueado', []).append(i)
+
+            # Estudiantes tocados: los que entran, cambian o salen respecto de la fila anterior
+            estudiantes = estado.get('estudiantes', {})
+            for estudiante_id, datos in estudiantes.items():
+                if estudiantes_anteriores.get(estudiante_id) != datos:
+                    self.por_estudiante.setdefault(estudiante_id, []).append(i)
+            for estudiante_id in estudiantes_anteriores:
+                if estudiante_id not in estudiantes:
+                    self.por_estudiante.setdefault(estudiante_id, []).append(i)
+            estudiantes_anteriores = estudiantes
+            cantidad += 1
+        self.cantidad_iteraciones = cantidad
+
+    def buscar(self, consulta: str) -> List[int]:
+        """Devuelve las iteraciones (ordenadas) que cumplen la consulta. Lanza ValueError si es inválida."""
+        normalizada = consulta.strip().lower().replace(" ", "")
+        if normalizada not in self._consultas:
+            self._consultas[normalizada] = self._resolver(normalizada)
+        return self._consultas[normalizada]
+
+    def _resolver(self, consulta: str) -> List[int]:
+        coincidencia = PATRON_COLA.match(consulta)
+        if coincidencia:
+            comparar = OPERADORES[coincidencia.group(1)]
+            limite = int(coincidencia.group(2))
+            listas = [iteraciones for largo, iteraciones in self.por_largo_cola.items() if comparar(largo, limite)]
+            return list(heapq.merge(*listas))
+
+        clave, separador, valor = consulta.partition(":")
+        if not separador or not valor:
+            # Un nombre de evento suelto también se acepta
+            if consulta in self.por_evento:
+                return self.por_evento[consulta]
+            raise ValueError(f"Consulta inválida: '{consulta}'")
+        if clave == "evento":
+            return self.por_evento.get(valor, [])
+        if clave == "estudiante":
+            if not valor.isdigit():
+                raise ValueError(f"Id de estudiante inválido: '{valor}'")
+            return self.por_estudiante.get(int(valor), [])
+        if clave == "tecnico":
+            estado = valor if valor == "bloqueado" else valor.upper()
+            return self.por_estado_tecnico.get(estado, [])
+        raise ValueError(f"Consulta inválida: '{consulta}'")
+
+    def siguiente(self, consulta: str, desde: int) -> Optional[int]:
+        """Primera iteración que cumple la consulta estrictamente después de 'desde'"""
+        iteraciones = self.buscar(consulta)
+        posicion = bisect.bisect_right(iteraciones, desde)
+        return iteraciones[posicion] if posicion < len(iteraciones) else None
+
+    def anterior(self, consulta: str, desde: int) -> Optional[int]:
+        """Última iteración que cumple la consulta estrictamente antes de 'desde'"""
+        iteraciones = self.buscar(consulta)
+        posicion = bisect.bisect_left(iteraciones, desde)
+        return iteraciones[posicion - 1] if posicion > 0 else None
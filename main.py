@@ -1,7 +1,8 @@
 import tkinter as tk
-import random
 from tkinter import ttk, messagebox, scrolledtext
-from simulador import SimuladorCertificados
+from cache import CacheResultados, simular_con_cache
+from indices import IndiceTraza
+from graficos import PanelGraficos
 
 class SimuladorApp(tk.Tk):
     """
@@ -12,8 +13,9 @@ class SimuladorApp(tk.Tk):
         super().__init__()
         self.title("Simulador Sistema Autogestión Certificados")
         self.geometry("1100x650")
-        self.simulador = None  # Instancia del simulador, se inicializa al ejecutar la simulación
         self.resultados = None  # Resultados de la simulación
+        self.cache = CacheResultados()  # Caché de resultados para no repetir corridas idénticas
+        self.indice = None  # Índices sobre el vector de estados para las búsquedas
 
         # --- Parámetros de simulación configurables por el usuario ---
         frame_params = ttk.LabelFrame(self, text="Parámetros de Simulación")
@@ -77,9 +79,30 @@ class SimuladorApp(tk.Tk):
             ttk.Label(self.frame_resumen, text=label + ":").grid(row=0, column=2*i, padx=5, pady=2, sticky="e")
             ttk.Label(self.frame_resumen, textvariable=self.resumen_vars[i]).grid(row=0, column=2*i+1, padx=5, pady=2, sticky="w")
 
+        # --- Búsqueda en el vector de estados ---
+        # Ejemplos: evento:regreso_estudiante, cola>=5, estudiante:123, tecnico:bloqueado
+        frame_busqueda = ttk.LabelFrame(self, text="Buscar en el vector de estados")
+        frame_busqueda.pack(fill="x", padx=10, pady=5)
+        self.consulta_var = tk.StringVar()
+        entry_consulta = ttk.Entry(frame_busqueda, textvariable=self.consulta_var, width=40)
+        entry_consulta.grid(row=0, column=0, padx=5, pady=2)
+        entry_consulta.bind("<Return>", lambda e: self.buscar_en_vector(1))
+        ttk.Button(frame_busqueda, text="Anterior", command=lambda: self.buscar_en_vector(-1)).grid(row=0, column=1, padx=5, pady=2)
+        ttk.Button(frame_busqueda, text="Siguiente", command=lambda: self.buscar_en_vector(1)).grid(row=0, column=2, padx=5, pady=2)
+        self.resultado_busqueda_var = tk.StringVar(value="evento:<tipo>, cola>=n, estudiante:<id>, tecnico:bloqueado")
+        ttk.Label(frame_busqueda, textvariable=self.resultado_busqueda_var).grid(row=0, column=3, padx=5, pady=2, sticky="w")
+
+        # --- Pestañas: tabla del vector de estados y gráficos ---
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill="both", expand=True, padx=10, pady=5)
+
         # --- Vector de estados (tabla principal) con scrollbars y columnas extendidas ---
-        self.frame_vector = ttk.LabelFrame(self, text="Vector de Estados (detalle extendido)")
-        self.frame_vector.pack(fill="both", expand=True, padx=10, pady=5)
+        self.frame_vector = ttk.LabelFrame(self.notebook, text="Vector de Estados (detalle extendido)")
+        self.notebook.add(self.frame_vector, text="Tabla")
+
+        # --- Gráficos de cola, terminales, técnico y espera contra el reloj ---
+        self.panel_graficos = PanelGraficos(self.notebook)
+        self.notebook.add(self.panel_graficos, text="Gráficos")
 
         # Scrollbars para la tabla principal
         self.tree_scroll_y = ttk.Scrollbar(self.frame_vector, orient="vertical")
@@ -181,20 +204,27 @@ class SimuladorApp(tk.Tk):
                 messagebox.showerror("Error de validación", "El tiempo de simulación debe ser mayor a 0.")
                 return
 
-            # --- Si todo es válido, ejecutar simulación ---
-            self.simulador = SimuladorCertificados(
-                servicio_min=servicio_min,
-                servicio_max=servicio_max,
-                revision_min=revision_min,
-                revision_max=revision_max,
-                ronda_min=ronda_min,
-                ronda_max=ronda_max,
-                media_llegada=media_llegada
+            # --- Si todo es válido, ejecutar simulación (o reutilizar el resultado cacheado) ---
+            parametros = {
+                'servicio_min': servicio_min,
+                'servicio_max': servicio_max,
+                'revision_min': revision_min,
+                'revision_max': revision_max,
+                'ronda_min': ronda_min,
+                'ronda_max': ronda_max,
+                'media_llegada': media_llegada
+            }
+            self.resultados = simular_con_cache(
+                parametros,
+                tiempo_simulacion=tiempo_sim,
+                max_iteraciones=100000,
+                semilla=42,
+                cache=self.cache
             )
-            random.seed(42)
-            self.resultados = self.simulador.simular(tiempo_simulacion=tiempo_sim, max_iteraciones=100000)
+            self.indice = IndiceTraza(self.resultados['vector_estados'])
             self.mostrar_resumen()
             self.mostrar_vector_estados(desde_iter)
+            self.panel_graficos.cargar(self.resultados['vector_estados'])
             self.text_detalle.delete("1.0", tk.END)
             messagebox.showinfo("Simulación", "¡Simulación completada!")
         except Exception as e:
@@ -274,9 +304,8 @@ class SimuladorApp(tk.Tk):
             self.tree.heading(c, text=h)
             self.tree.column(c, width=100)
 
-        # Mostrar los estados en la tabla
-        for i in range(inicio, fin):
-            estado = vector[i]
+        # Mostrar los estados en la tabla (recorrido secuencial: cada estado se reconstruye una vez)
+        for i, estado in enumerate(vector.iterar(inicio, fin), start=inicio):
             # --- Evento y reloj ---
             evento = estado['evento']
             reloj = f"{estado['reloj']:.2f}"
@@ -361,6 +390,42 @@ class SimuladorApp(tk.Tk):
                         row.append("")  # Si no hay estudiante nuevo, dejar la columna vacía
             self.tree.insert("", "end", iid=str(i), values=row)                    
 
+    def buscar_en_vector(self, direccion):
+        """
+        Salta en la tabla a la siguiente (direccion=1) o anterior (direccion=-1) iteración
+        que cumple la consulta, a partir de la fila seleccionada.
+        """
+        if self.indice is None:
+            return
+        consulta = self.consulta_var.get()
+        try:
+            coincidencias = self.indice.buscar(consulta)
+        except ValueError as e:
+            messagebox.showerror("Búsqueda", str(e))
+            return
+
+        seleccion = self.tree.selection()
+        actual = int(seleccion[0]) if seleccion else -1
+        if direccion > 0:
+            idx = self.indice.siguiente(consulta, actual)
+        else:
+            idx = self.indice.anterior(consulta, actual if seleccion else self.indice.cantidad_iteraciones)
+        if idx is None:
+            self.resultado_busqueda_var.set(f"{len(coincidencias)} coincidencias, no hay más en esa dirección")
+            return
+        self.resultado_busqueda_var.set(f"{len(coincidencias)} coincidencias, iteración {idx}")
+        self.ir_a_iteracion(idx)
+
+    def ir_a_iteracion(self, idx):
+        """Selecciona y muestra la fila de la iteración indicada (recargando la tabla si quedó fuera)"""
+        self.notebook.select(self.frame_vector)
+        if not self.tree.exists(str(idx)):
+            self.desde_iter_var.set(idx)
+            self.mostrar_vector_estados(idx)
+        self.tree.selection_set(str(idx))
+        self.tree.focus(str(idx))
+        self.tree.see(str(idx))
+
     def mostrar_detalle_iteracion(self, event):
         """
         Muestra el detalle completo de la iteración seleccionada en la tabla.
@@ -377,6 +442,7 @@ class SimuladorApp(tk.Tk):
         lines.append(f"Próximos eventos: {estado['proximos_eventos']}")
         lines.append("")
         lines.append(f"Técnico: Estado={estado['tecnico']['estado']}, Próxima ronda={estado['tecnico']['proxima_ronda']}, Fin revisión={estado['tecnico']['fin_revision']}")
+        lines.append(f"Terminales pendientes de revisión: {estado.get('pendientes_revision', [])}")
         lines.append("")
         lines.append("Terminales:")
         for i, terminal in enumerate(estado['terminales']):
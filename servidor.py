@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from cache import CacheResultados, DIRECTORIO_CACHE, simular_con_cache
+
+HOST_POR_DEFECTO = "127.0.0.1"
+PUERTO_POR_DEFECTO = 8765
+
+# Protocolo: un mensaje JSON por línea en cada sentido.
+#   Cliente -> servidor:
+#     {"tipo": "enviar", "id": ..., "parametros": {...}, "tiempo_simulacion": ..., "max_iteraciones": ..., "semilla": ...}
+#     {"tipo": "cancelar", "id": ...}
+#   Servidor -> cliente:
+#     encolado, iniciado, progreso (iteraciones, reloj), resultado (resumen), cancelado, error (mensaje)
+
+class TrabajoCancelado(Exception):
+    """Se lanza dentro del proceso trabajador cuando se cancela un trabajo en ejecución"""
+
+def validar_trabajo(mensaje: Dict) -> Dict:
+    """
+    Convierte los campos de un mensaje 'enviar' a sus tipos (parametros, tiempo_simulacion,
+    max_iteraciones, semilla). Lanza ValueError con un mensaje para el cliente si no se puede.
+    """
+    parametros = mensaje.get('parametros', {})
+    if not isinstance(parametros, dict):
+        raise ValueError("'parametros' debe ser un objeto")
+    try:
+        tiempo_simulacion = float(mensaje.get('tiempo_simulacion', 120.0))
+        max_iteraciones = int(mensaje.get('max_iteraciones', 100000))
+        semilla = mensaje.get('semilla', 42)
+        semilla = None if semilla is None else int(semilla)
+    except (TypeError, ValueError):
+        raise ValueError("'tiempo_simulacion', 'max_iteraciones' y 'semilla' deben ser números") from None
+    if not tiempo_simulacion > 0 or max_iteraciones < 1:
+        raise ValueError("'tiempo_simulacion' y 'max_iteraciones' deben ser positivos")
+    return {'parametros': parametros, 'tiempo_simulacion': tiempo_simulacion,
+            'max_iteraciones': max_iteraciones, 'semilla': semilla}
+
+def ejecutar_trabajo(trabajo_id: str, parametros: Dict, tiempo_simulacion: float, max_iteraciones: int,
+                     semilla: Optional[int], cola_progreso, cancelados, directorio_cache: Optional[str]) -> Dict:
+    """
+    Ejecuta un trabajo en un proceso del pool y devuelve el resumen (sin vector de estados).
+    El avance se informa por 'cola_progreso'; si el id aparece en 'cancelados' se aborta.
+    """
+    def progreso(iteraciones, reloj):
+        if trabajo_id in cancelados:
+            raise TrabajoCancelado(trabajo_id)
+        cola_progreso.put((trabajo_id, iteraciones, reloj))
+
+    cache = CacheResultados(directorio_cache) if directorio_cache else None
+    return simular_con_cache(parametros, tiempo_simulacion, max_iteraciones, semilla=semilla,
+                             cache=cache, con_traza=False, progreso=progreso)
+
+class ServidorSimulacion:
+    """
+    Servidor asyncio de trabajos de simulación sobre TCP local.
+    Los trabajos se encolan en una cola acotada (si está llena se deja de leer al cliente,
+    que así recibe contrapresión) y se ejecutan en un pool de procesos que vive mientras
+    vive el servidor.
+    """
+    def __init__(self, host: str = HOST_POR_DEFECTO, puerto: int = PUERTO_POR_DEFECTO,
+                 procesos: Optional[int] = None, max_pendientes: int = 100,
+                 directorio_cache: Optional[str] = DIRECTORIO_CACHE):
+        self.host = host
+        self.puerto = puerto  # Con 0 se elige un puerto libre; se actualiza al iniciar
+        self.procesos = procesos or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes
+        self.directorio_cache = directorio_cache  # None para no usar la caché
+
+        self._trabajos = {}  # id -> {'escritor': StreamWriter, 'estado': 'encolado' | 'ejecutando' | 'cancelado'}
+        self._contador_ids = itertools.count(1)
+        self._servidor = None
+        self._tareas = []
+
+    async def iniciar(self):
+        """Levanta el pool de procesos y empieza a aceptar conexiones"""
+        self._manager = multiprocessing.Manager()
+        self._cola_progreso = self._manager.Queue()
+        self._cancelados = self._manager.dict()
+        self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+        self._cola = asyncio.Queue(maxsize=self.max_pendientes)
+
+        self._servidor = await asyncio.start_server(self._atender_cliente, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+
+        self._tareas = [asyncio.create_task(self._ejecutor()) for _ in range(self.procesos)]
+        self._tareas.append(asyncio.create_task(self._reenviar_progreso()))
+
+    async def servir(self):
+        """Atiende (iniciando el servidor si hace falta) hasta que se cancele"""
+        if self._servidor is None:
+            await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.detener()
+
+    async def detener(self):
+        """Cancela los trabajos pendientes, cierra las conexiones y libera el pool"""
+        if self._servidor is None:
+            return
+        self._servidor.close()
+        for trabajo_id, trabajo in self._trabajos.items():
+            if trabajo['estado'] == 'ejecutando':
+                self._cancelados[trabajo_id] = True
+            else:
+                trabajo['estado'] = 'cancelado'
+        for tarea in self._tareas:
+            tarea.cancel()
+        self._cola_progreso.put(None)  # Libera el hilo que espera progreso
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, lambda: self._pool.shutdown(wait=True, cancel_futures=True))
+        self._manager.shutdown()
+        self._servidor = None
+
+    async def _enviar(self, escritor: asyncio.StreamWriter, mensaje: Dict):
+        """Envía un mensaje al cliente, ignorando conexiones ya cerradas"""
+        if escritor.is_closing():
+            return
+        escritor.write((json.dumps(mensaje) + "\n").encode("utf-8"))
+        try:
+            await escritor.drain()
+        except ConnectionError:
+            pass
+
+    async def _atender_cliente(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Lee los mensajes de un cliente hasta que cierra la conexión"""
+        ids_cliente = set()
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except ConnectionError:
+                    break
+                if not linea:
+                    break
+                try:
+                    mensaje = json.loads(linea)
+                except ValueError:
+                    await self._enviar(escritor, {'tipo': 'error', 'mensaje': "Mensaje JSON inválido"})
+                    continue
+
+                tipo = mensaje.get('tipo')
+                if tipo == 'enviar':
+                    trabajo_id = str(mensaje.get('id') or next(self._contador_ids))
+                    if trabajo_id in self._trabajos:
+                        await self._enviar(escritor, {'tipo': 'error', 'id': trabajo_id, 'mensaje': "Id de trabajo repetido"})
+                        continue
+                    # Se valida acá: un valor inválido no debe llegar a la tarea que ejecuta
+                    try:
+                        mensaje = validar_trabajo(mensaje)
+                    except ValueError as e:
+                        await self._enviar(escritor, {'tipo': 'error', 'id': trabajo_id, 'mensaje': str(e)})
+                        continue
+                    self._trabajos[trabajo_id] = {'escritor': escritor, 'estado': 'encolado'}
+                    ids_cliente.add(trabajo_id)
+                    # Si la cola está llena, se espera acá y no se leen más mensajes de este cliente
+                    await self._cola.put((trabajo_id, mensaje))
+                    await self._enviar(escritor, {'tipo': 'encolado', 'id': trabajo_id})
+                elif tipo == 'cancelar':
+                    await self._cancelar(str(mensaje.get('id')), escritor)
+                else:
+                    await self._enviar(escritor, {'tipo': 'error', 'mensaje': f"Tipo de mensaje desconocido: {tipo}"})
+        finally:
+            # Si el cliente se desconecta, sus trabajos ya no le interesan a nadie
+            for trabajo_id in ids_cliente:
+                if trabajo_id in self._trabajos:
+                    await self._cancelar(trabajo_id, escritor)
+            escritor.close()
+
+    async def _cancelar(self, trabajo_id: str, escritor: asyncio.StreamWriter):
+        """Cancela un trabajo encolado (inmediato) o en ejecución (en el próximo aviso de progreso)"""
+        trabajo = self._trabajos.get(trabajo_id)
+        if trabajo is None or trabajo['escritor'] is not escritor:
+            await self._enviar(escritor, {'tipo': 'error', 'id': trabajo_id, 'mensaje': "Trabajo inexistente o ya finalizado"})
+            return
+        if trabajo['estado'] == 'encolado':
+            trabajo['estado'] = 'cancelado'
+            await self._enviar(escritor, {'tipo': 'cancelado', 'id': trabajo_id})
+        elif trabajo['estado'] == 'ejecutando':
+            self._cancelados[trabajo_id] = True
+
+    async def _ejecutor(self):
+        """Toma trabajos de la cola y los ejecuta de a uno en el pool de procesos"""
+        loop = asyncio.get_running_loop()
+        while True:
+            trabajo_id, mensaje = await self._cola.get()
+            trabajo = self._trabajos.get(trabajo_id)
+            try:
+                if trabajo is None or trabajo['estado'] == 'cancelado':
+                    continue
+                trabajo['estado'] = 'ejecutando'
+                escritor = trabajo['escritor']
+                await self._enviar(escritor, {'tipo': 'iniciado', 'id': trabajo_id})
+                futuro = loop.run_in_executor(
+                    self._pool, ejecutar_trabajo, trabajo_id, mensaje['parametros'],
+                    mensaje['tiempo_simulacion'], mensaje['max_iteraciones'], mensaje['semilla'],
+                    self._cola_progreso, self._cancelados, self.directorio_cache
+                )
+                try:
+                    # Protegido: si se cancela esta tarea (detener), el proceso sigue hasta ver
+                    # la marca en 'cancelados' y la marca no se borra antes de que termine
+                    resumen = await asyncio.shield(futuro)
+                    respuesta = {'tipo': 'resultado', 'id': trabajo_id, 'resumen': resumen}
+                except asyncio.CancelledError:
+                    self._cancelados[trabajo_id] = True
+                    try:
+                        await futuro
+                    except BaseException:
+                        pass
+                    raise
+                except TrabajoCancelado:
+                    respuesta = {'tipo': 'cancelado', 'id': trabajo_id}
+                except Exception as e:
+                    respuesta = {'tipo': 'error', 'id': trabajo_id, 'mensaje': str(e)}
+                # Se quita antes de responder para no reenviar progreso después del resultado
+                self._trabajos.pop(trabajo_id, None)
+                await self._enviar(escritor, respuesta)
+            finally:
+                self._trabajos.pop(trabajo_id, None)
+                self._cancelados.pop(trabajo_id, None)
+                self._cola.task_done()
+
+    async def _reenviar_progreso(self):
+        """Reenvía a cada cliente el progreso que informan los procesos trabajadores"""
+        loop = asyncio.get_running_loop()
+        while True:
+            elemento = await loop.run_in_executor(None, self._cola_progreso.get)
+            if elemento is None:
+                return
+            trabajo_id, iteraciones, reloj = elemento
+            trabajo = self._trabajos.get(trabajo_id)
+            if trabajo is not None and trabajo['estado'] == 'ejecutando':
+                await self._enviar(trabajo['escritor'], {
+                    'tipo': 'progreso', 'id': trabajo_id, 'iteraciones': iteraciones, 'reloj': reloj
+                })
+
+class ClienteSimulacion:
+    """Cliente asyncio para enviar trabajos a un ServidorSimulacion"""
+    def __init__(self, host: str = HOST_POR_DEFECTO, puerto: int = PUERTO_POR_DEFECTO):
+        self.host = host
+        self.puerto = puerto
+        self._lector = None
+        self._escritor = None
+
+    async def conectar(self):
+        self._lector, self._escritor = await asyncio.open_connection(self.host, self.puerto)
+
+    async def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            await self._escritor.wait_closed()
+            self._escritor = None
+
+    async def __aenter__(self):
+        await self.conectar()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+
+    async def _enviar(self, mensaje: Dict):
+        self._escritor.write((json.dumps(mensaje) + "\n").encode("utf-8"))
+        await self._escritor.drain()
+
+    async def enviar(self, parametros: Dict, tiempo_simulacion: float = 120.0, max_iteraciones: int = 100000,
+                     semilla: Optional[int] = 42, trabajo_id: Optional[str] = None) -> str:
+        """Envía un trabajo (parámetros del constructor de SimuladorCertificados) y devuelve su id"""
+        trabajo_id = trabajo_id or uuid.uuid4().hex
+        await self._enviar({
+            'tipo': 'enviar', 'id': trabajo_id, 'parametros': parametros,
+            'tiempo_simulacion': tiempo_simulacion, 'max_iteraciones': max_iteraciones, 'semilla': semilla
+        })
+        return trabajo_id
+
+    async def cancelar(self, trabajo_id: str):
+        await self._enviar({'tipo': 'cancelar', 'id': trabajo_id})
+
+    async def recibir(self) -> Optional[Dict]:
+        """Devuelve el próximo mensaje del servidor, o None si cerró la conexión"""
+        linea = await self._lector.readline()
+        if not linea:
+            return None
+        return json.loads(linea)
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Servidor local de trabajos de simulación")
+    parser.add_argument("--host", default=HOST_POR_DEFECTO)
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--max-pendientes", type=int, default=100, help="Tamaño máximo de la cola de trabajos")
+    parser.add_argument("--sin-cache", action="store_true", help="No usar la caché de resultados")
+    args = parser.parse_args()
+
+    servidor = ServidorSimulacion(
+        host=args.host,
+        puerto=args.puerto,
+        procesos=args.procesos,
+        max_pendientes=args.max_pendientes,
+        directorio_cache=None if args.sin_cache else DIRECTORIO_CACHE
+    )
+    await servidor.iniciar()
+    print(f"Servidor de simulación escuchando en {servidor.host}:{servidor.puerto} ({servidor.procesos} procesos)")
+    await servidor.servir()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
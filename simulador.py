@@ -1,11 +1,17 @@
+import copy
 import random
 import math
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Callable
 import time
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from modelos import Estudiante, Terminal, Tecnico, Evento
+from traza import TrazaDelta
+
+# Versión del motor de simulación. Se incrementa cada vez que un cambio en la
+# lógica altera los resultados, para invalidar los resultados cacheados.
+VERSION_MOTOR = "1.2"
 
 class SimuladorCertificados:
     def __init__(self, servicio_min=5, servicio_max=8, revision_min=3, revision_max=10,
@@ -26,11 +32,17 @@ class SimuladorCertificados:
         self.estudiantes_retirados = 0
         self.acum_tiempo_espera = 0.0
         
-        # Para el vector de estados
-        self.vector_estados = []
+        # Para el vector de estados (solo se guardan los cambios de cada evento)
+        self.vector_estados = TrazaDelta()
+        # Ids de estudiantes que entraron, cambiaron o salieron desde el último estado guardado
+        self.cambios_estudiantes = set()
         
         # Variables aleatorias usadas
         self.rnd_usados = {}
+        # Generador de números aleatorios propio (random.Random); con None se usa el global
+        # del módulo random (se siembra con random.seed). No se guarda el módulo en sí
+        # porque la instancia dejaría de poder copiarse o serializarse
+        self.rng = None
 
         # Parámetros del modelo (fijos y configurables)
         self.servicio_min = servicio_min
@@ -48,26 +60,63 @@ class SimuladorCertificados:
         # Nueva lista para llevar el control de las terminales pendientes de revisión
         self.terminales_pendientes_revision = []
 
+    def parametros(self) -> Dict:
+        """Devuelve los parámetros del modelo (configurables y fijos)"""
+        return {
+            'servicio_min': self.servicio_min,
+            'servicio_max': self.servicio_max,
+            'revision_min': self.revision_min,
+            'revision_max': self.revision_max,
+            'ronda_min': self.ronda_min,
+            'ronda_max': self.ronda_max,
+            'media_llegada': self.media_llegada,
+            'max_cola': self.max_cola,
+            'tiempo_regreso': self.tiempo_regreso,
+        }
+
+    def clonar(self, rng=None) -> 'SimuladorCertificados':
+        """
+        Copia independiente del estado dinámico (entidades, eventos futuros y acumuladores)
+        para seguir simulando desde este punto. No copia el vector de estados (el clon
+        arranca uno vacío) ni el generador: el clon usa 'rng' (None: el global de random).
+        Es mucho más barata que copy.deepcopy, que copia también el estado del generador.
+        """
+        clon = copy.copy(self)
+        clon.terminales = [copy.copy(terminal) for terminal in self.terminales]
+        clon.tecnico = copy.copy(self.tecnico)
+        clon.estudiantes = {eid: copy.copy(estudiante) for eid, estudiante in self.estudiantes.items()}
+        clon.cola_estudiantes = list(self.cola_estudiantes)
+        clon.eventos_futuros = list(self.eventos_futuros)  # Los eventos no se modifican una vez creados
+        clon.rnd_usados = dict(self.rnd_usados)
+        clon.terminales_pendientes_revision = list(self.terminales_pendientes_revision)
+        if hasattr(self, 'demora_revision'):  # Se crean en la primera revisión
+            clon.demora_revision = list(self.demora_revision)
+            clon.fin_revision = list(self.fin_revision)
+        clon.vector_estados = TrazaDelta()
+        clon.cambios_estudiantes = set(self.cambios_estudiantes)
+        clon.rng = rng
+        return clon
+
     def generar_tiempo_llegada_estudiante(self) -> Tuple[float, float]:
-        rnd = random.random()
+        rnd = (self.rng or random).random()
         tiempo = -self.media_llegada * math.log(1 - rnd)
         self.rnd_usados['llegada_estudiante'] = rnd
         return tiempo, rnd
 
     def generar_tiempo_servicio(self, terminal) -> Tuple[float, float]:
-        rnd = random.random()
+        rnd = (self.rng or random).random()
         tiempo = self.servicio_min + (self.servicio_max - self.servicio_min) * rnd
         self.rnd_usados[f'servicio_{terminal.id}'] = rnd
         return tiempo, rnd
 
     def generar_tiempo_revision(self, terminal) -> Tuple[float, float]:
-        rnd = random.random()
+        rnd = (self.rng or random).random()
         tiempo = self.revision_min + (self.revision_max - self.revision_min) * rnd
         self.rnd_usados[f'revision_{terminal.id}'] = rnd
         return tiempo, rnd
 
     def generar_tiempo_entre_rondas(self) -> Tuple[float, float]:
-        rnd = random.random()
+        rnd = (self.rng or random).random()
         tiempo = self.ronda_min + (self.ronda_max - self.ronda_min) * rnd
         self.rnd_usados['ronda'] = rnd
         return tiempo, rnd
@@ -119,6 +168,7 @@ class SimuladorCertificados:
                 self.asignar_estudiante_terminal(estudiante, terminal_libre)
 
         self.estudiantes[estudiante.id] = estudiante
+        self.cambios_estudiantes.add(estudiante.id)
         tiempo_llegada, rnd = self.generar_tiempo_llegada_estudiante()
         self.agregar_evento(self.reloj + tiempo_llegada, 'llegada_estudiante')
 
@@ -136,6 +186,7 @@ class SimuladorCertificados:
         estudiante.estado = 'UT'
         estudiante.terminal_asignada = terminal.id
         estudiante.hora_inicio_servicio = self.reloj
+        self.cambios_estudiantes.add(estudiante.id)
         
         terminal.estado = 'O'
         terminal.estudiante_id = estudiante.id
@@ -163,6 +214,7 @@ class SimuladorCertificados:
         
         # Remover estudiante del sistema
         del self.estudiantes[estudiante.id]
+        self.cambios_estudiantes.add(estudiante.id)
         
         # Asignar siguiente estudiante SOLO a la terminal recién liberada
         if self.cola_estudiantes:
@@ -262,14 +314,21 @@ class SimuladorCertificados:
         if self.estudiantes_atendidos > 0:
             tiempo_promedio_espera = self.acum_tiempo_espera / self.estudiantes_atendidos
         
-        # Agregar clave 'estudiantes' al estado actual
-        estudiantes_estado = {}
-        for estudiante_id, estudiante in self.estudiantes.items():
-            estudiantes_estado[estudiante_id] = {
-                'estado': estudiante.estado,
-                'hora_llegada': estudiante.hora_llegada,
-                'terminal_asignada': estudiante.terminal_asignada
-            }
+        # Estudiantes: solo los que cambiaron desde el estado anterior (la traza arma el
+        # diccionario completo), así el costo por evento no crece con la ocupación
+        estudiantes_modificados = {}
+        estudiantes_eliminados = []
+        for estudiante_id in self.cambios_estudiantes:
+            estudiante = self.estudiantes.get(estudiante_id)
+            if estudiante is None:
+                estudiantes_eliminados.append(estudiante_id)
+            else:
+                estudiantes_modificados[estudiante_id] = {
+                    'estado': estudiante.estado,
+                    'hora_llegada': estudiante.hora_llegada,
+                    'terminal_asignada': estudiante.terminal_asignada
+                }
+        self.cambios_estudiantes.clear()
 
         estado = {
             'reloj': self.reloj,
@@ -285,15 +344,14 @@ class SimuladorCertificados:
             'acum_tiempo_espera': self.acum_tiempo_espera,
             'tiempo_promedio_espera': tiempo_promedio_espera,
             'rnd_usados': self.rnd_usados.copy(),
-            'estudiantes': estudiantes_estado  # Clave agregada
+            'pendientes_revision': list(self.terminales_pendientes_revision),
         }
 
-        self.vector_estados.append(estado)
+        self.vector_estados.agregar_cambios(estado, estudiantes_modificados, estudiantes_eliminados)
         self.rnd_usados.clear()
 
-    def simular(self, tiempo_simulacion: float, max_iteraciones: int = 100000) -> Dict:
-        """Ejecuta la simulación"""
-        # Inicialización
+    def inicializar(self):
+        """Programa los primeros eventos y guarda el estado inicial (reloj en 0)"""
         self.reloj = 0.0
         
         # Programar primera llegada de estudiante
@@ -308,6 +366,50 @@ class SimuladorCertificados:
         # Guardar estado inicial
         evento_inicial = Evento(0, 'inicio', {})
         self.guardar_estado_actual(evento_inicial)
+
+    def procesar_regreso_estudiante(self, estudiante_id: int):
+        """Procesa el regreso de un estudiante que se había retirado"""
+        if estudiante_id in self.estudiantes:
+            estudiante = self.estudiantes[estudiante_id]
+            estudiante.estado = 'ET'
+            estudiante.hora_llegada = self.reloj
+            self.cambios_estudiantes.add(estudiante_id)
+            if self.contar_personas_esperando() < self.max_cola:
+                self.cola_estudiantes.append(estudiante_id)
+                terminal_libre = self.obtener_terminal_libre()
+                if (terminal_libre and 
+                    (self.tecnico.estado != 'R' or 
+                     self.tecnico.terminal_revisando != terminal_libre.id)):
+                    self.asignar_estudiante_terminal(estudiante, terminal_libre)
+
+    def procesar_evento(self, evento: Evento):
+        """Avanza el reloj hasta el evento y lo procesa según su tipo"""
+        # Avanzar reloj
+        self.reloj = evento.tiempo
+        
+        # Procesar evento según tipo
+        if evento.tipo == 'llegada_estudiante':
+            self.procesar_llegada_estudiante()
+        elif evento.tipo == 'fin_servicio':
+            self.procesar_fin_servicio(evento.datos['terminal_id'])
+        elif evento.tipo == 'inicio_ronda':
+            self.procesar_inicio_ronda_tecnico()
+        elif evento.tipo == 'fin_revision':
+            self.procesar_fin_revision()
+        elif evento.tipo == 'regreso_estudiante':
+            self.procesar_regreso_estudiante(evento.datos['estudiante_id'])
+
+    def simular(self, tiempo_simulacion: float, max_iteraciones: int = 100000,
+                progreso: Optional[Callable[[int, float], None]] = None,
+                intervalo_progreso: int = 1000, guardar_traza: bool = True) -> Dict:
+        """
+        Ejecuta la simulación.
+        Si se indica 'progreso', se lo llama con (iteraciones, reloj) cada 'intervalo_progreso' iteraciones.
+        Con guardar_traza=False no se arma el vector de estados (solo interesan las métricas,
+        y la memoria no crece con la cantidad de eventos); el resultado no trae 'vector_estados'.
+        """
+        # Inicialización
+        self.inicializar()
         
         iteraciones = 0
         
@@ -320,42 +422,24 @@ class SimuladorCertificados:
             if not evento:
                 break
             
-            # Avanzar reloj
-            self.reloj = evento.tiempo
-            
-            # Procesar evento según tipo
-            if evento.tipo == 'llegada_estudiante':
-                self.procesar_llegada_estudiante()
-            elif evento.tipo == 'fin_servicio':
-                self.procesar_fin_servicio(evento.datos['terminal_id'])
-            elif evento.tipo == 'inicio_ronda':
-                self.procesar_inicio_ronda_tecnico()
-            elif evento.tipo == 'fin_revision':
-                self.procesar_fin_revision()
-            elif evento.tipo == 'regreso_estudiante':
-                estudiante_id = evento.datos['estudiante_id']
-                if estudiante_id in self.estudiantes:
-                    estudiante = self.estudiantes[estudiante_id]
-                    estudiante.estado = 'ET'
-                    estudiante.hora_llegada = self.reloj
-                    if self.contar_personas_esperando() < self.max_cola:
-                        self.cola_estudiantes.append(estudiante_id)
-                        terminal_libre = self.obtener_terminal_libre()
-                        if (terminal_libre and 
-                            (self.tecnico.estado != 'R' or 
-                             self.tecnico.terminal_revisando != terminal_libre.id)):
-                            self.asignar_estudiante_terminal(estudiante, terminal_libre)
+            self.procesar_evento(evento)
 
             # Guardar estado
-            self.guardar_estado_actual(evento)
+            if guardar_traza:
+                self.guardar_estado_actual(evento)
+            else:
+                self.rnd_usados.clear()
+                self.cambios_estudiantes.clear()
             iteraciones += 1
+            if progreso is not None and iteraciones % intervalo_progreso == 0:
+                progreso(iteraciones, self.reloj)
         
         # Calcular métricas finales
         total_llegadas = self.estudiantes_atendidos + self.estudiantes_retirados
         porcentaje_retiros = (self.estudiantes_retirados / total_llegadas * 100) if total_llegadas > 0 else 0
         tiempo_promedio_espera = (self.acum_tiempo_espera / self.estudiantes_atendidos) if self.estudiantes_atendidos > 0 else 0
         
-        return {
+        resultados = {
             'vector_estados': self.vector_estados,
             'iteraciones_realizadas': iteraciones,
             'tiempo_final': self.reloj,
@@ -364,6 +448,9 @@ class SimuladorCertificados:
             'porcentaje_retiros': porcentaje_retiros,
             'tiempo_promedio_espera': tiempo_promedio_espera,
         }
+        if not guardar_traza:
+            del resultados['vector_estados']
+        return resultados
 
     def mostrar_vector_estados(self, desde_iteracion: int = 0, 
                              cantidad_iteraciones: int = None, 
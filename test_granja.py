@@ -0,0 +1,62 @@
+import asyncio
+import json
+import unittest
+
+from granja import Coordinador, UnidadFallida, crear_unidades, ejecutar_local, ejecutar_trabajador
+
+UNIDADES = crear_unidades([{'media_llegada': 1.5}, {'media_llegada': 2}], replicas=3, tiempo_simulacion=200)
+
+class PruebasGranja(unittest.IsolatedAsyncioTestCase):
+    """Coordinador y trabajadores reales en 127.0.0.1 (puerto libre), sin caché"""
+    @classmethod
+    def setUpClass(cls):
+        cls.referencia = ejecutar_local(UNIDADES, procesos=2)
+
+    async def iniciar(self, unidades=UNIDADES) -> Coordinador:
+        coordinador = Coordinador(unidades, puerto=0)
+        await coordinador.iniciar()
+        return coordinador
+
+    def trabajador(self, coordinador: Coordinador) -> asyncio.Task:
+        return asyncio.create_task(ejecutar_trabajador(puerto=coordinador.puerto, procesos=1, directorio_cache=None))
+
+    async def pedir(self, coordinador: Coordinador):
+        """Conexión a mano que pide una unidad; devuelve (lector, escritor, unidad)"""
+        lector, escritor = await asyncio.open_connection("127.0.0.1", coordinador.puerto)
+        escritor.write(b'{"tipo": "pedir"}\n')
+        await escritor.drain()
+        return lector, escritor, json.loads(await lector.readline())
+
+    async def test_igual_a_ejecucion_local(self):
+        coordinador = await self.iniciar()
+        trabajadores = [self.trabajador(coordinador) for _ in range(2)]
+        agregado = await asyncio.wait_for(coordinador.ejecutar(), 60)
+        ejecutadas = await asyncio.gather(*trabajadores)
+        self.assertEqual(agregado, self.referencia)
+        self.assertEqual(sum(ejecutadas), len(UNIDADES))
+
+    async def test_trabajador_que_se_cae(self):
+        coordinador = await self.iniciar()
+        _, escritor, unidad = await self.pedir(coordinador)
+        # Resultados que no le corresponden a esta conexión: se ignoran
+        for indice in (len(UNIDADES) + 5, (unidad['indice'] + 1) % len(UNIDADES)):
+            escritor.write((json.dumps({'tipo': 'resultado', 'indice': indice, 'resumen': {}}) + "\n").encode())
+        await escritor.drain()
+        trabajadores = [self.trabajador(coordinador) for _ in range(2)]
+        escritor.close()  # Se cae con la unidad asignada: vuelve a la cola
+        agregado = await asyncio.wait_for(coordinador.ejecutar(), 60)
+        ejecutadas = await asyncio.gather(*trabajadores)
+        self.assertEqual(agregado, self.referencia)
+        self.assertEqual(sum(ejecutadas), len(UNIDADES))
+
+    async def test_unidad_que_falla(self):
+        unidades = crear_unidades([{'media_llegada': 2}, {'no_existe': 1}], replicas=2, tiempo_simulacion=50)
+        coordinador = await self.iniciar(unidades)
+        trabajador = self.trabajador(coordinador)
+        with self.assertRaises(UnidadFallida) as contexto:
+            await asyncio.wait_for(coordinador.ejecutar(), 60)
+        self.assertIn("no_existe", str(contexto.exception))
+        await asyncio.wait_for(trabajador, 30)  # El trabajador no muere: recibe 'fin'
+
+if __name__ == "__main__":
+    unittest.main()
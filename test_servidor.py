@@ -0,0 +1,78 @@
+import asyncio
+import tempfile
+import time
+import unittest
+
+from servidor import ClienteSimulacion, ServidorSimulacion
+
+# Trabajo que no termina solo en lo que dura una prueba
+TRABAJO_LARGO = {'parametros': {'media_llegada': 1.0}, 'tiempo_simulacion': 1e9, 'max_iteraciones': 10 ** 9}
+
+class PruebasServidor(unittest.IsolatedAsyncioTestCase):
+    """Servidor real en 127.0.0.1 (puerto libre) con un solo proceso en el pool"""
+    async def asyncSetUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.servidor = ServidorSimulacion(puerto=0, procesos=1, directorio_cache=self.directorio.name)
+        await self.servidor.iniciar()
+        self.cliente = ClienteSimulacion(puerto=self.servidor.puerto)
+        await self.cliente.conectar()
+
+    async def asyncTearDown(self):
+        await self.cliente.cerrar()
+        await self.servidor.detener()
+        self.directorio.cleanup()
+
+    async def esperar(self, tipo, trabajo_id, limite=30.0):
+        """Lee mensajes hasta recibir 'tipo' para el trabajo; devuelve el mensaje"""
+        async def leer():
+            while True:
+                mensaje = await self.cliente.recibir()
+                self.assertIsNotNone(mensaje, "El servidor cerró la conexión")
+                if mensaje.get('tipo') == tipo and mensaje.get('id') == trabajo_id:
+                    return mensaje
+        return await asyncio.wait_for(leer(), limite)
+
+    async def test_resultado(self):
+        trabajo_id = await self.cliente.enviar({'media_llegada': 2.0}, tiempo_simulacion=60)
+        mensaje = await self.esperar('resultado', trabajo_id)
+        self.assertIn('porcentaje_retiros', mensaje['resumen'])
+
+    async def test_valores_invalidos(self):
+        invalido = await self.cliente.enviar({'media_llegada': 2.0}, tiempo_simulacion="abc")
+        mensaje = await self.esperar('error', invalido)
+        self.assertIn('tiempo_simulacion', mensaje['mensaje'])
+        # Parámetro que el simulador no conoce: falla en el proceso y se informa como error
+        desconocido = await self.cliente.enviar({'no_existe': 1}, tiempo_simulacion=60)
+        await self.esperar('error', desconocido)
+        # El único ejecutor sigue vivo
+        valido = await self.cliente.enviar({'media_llegada': 2.0}, tiempo_simulacion=60)
+        await self.esperar('resultado', valido)
+
+    async def test_cancelar_encolado(self):
+        largo = await self.cliente.enviar(**TRABAJO_LARGO)
+        await self.esperar('iniciado', largo)
+        encolado = await self.cliente.enviar({'media_llegada': 2.0}, tiempo_simulacion=60)
+        await self.esperar('encolado', encolado)
+        await self.cliente.cancelar(encolado)
+        await self.esperar('cancelado', encolado)
+        await self.cliente.cancelar(largo)
+        await self.esperar('cancelado', largo)
+
+    async def test_cancelar_en_ejecucion(self):
+        largo = await self.cliente.enviar(**TRABAJO_LARGO)
+        await self.esperar('progreso', largo)
+        await self.cliente.cancelar(largo)
+        await self.esperar('cancelado', largo)
+        # El proceso quedó libre para el siguiente trabajo
+        siguiente = await self.cliente.enviar({'media_llegada': 2.0}, tiempo_simulacion=60)
+        await self.esperar('resultado', siguiente)
+
+    async def test_detener_con_trabajo_en_ejecucion(self):
+        largo = await self.cliente.enviar(**TRABAJO_LARGO)
+        await self.esperar('progreso', largo)
+        inicio = time.monotonic()
+        await asyncio.wait_for(self.servidor.detener(), 30.0)
+        self.assertLess(time.monotonic() - inicio, 10.0)
+
+if __name__ == "__main__":
+    unittest.main()
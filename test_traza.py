@@ -0,0 +1,104 @@
+import pickle
+import random
+import unittest
+
+from simulador import SimuladorCertificados
+from traza import TrazaDelta
+
+def estados_sinteticos(cantidad: int, semilla: int = 1):
+    """Estados con la forma de los del simulador, con estudiantes que entran, cambian y salen"""
+    rng = random.Random(semilla)
+    estudiantes = {}
+    siguiente_id = 1
+    estados = []
+    for i in range(cantidad):
+        estudiantes = dict(estudiantes)
+        accion = rng.random()
+        if accion < 0.4 or not estudiantes:
+            estudiantes[siguiente_id] = {'estado': 'ET', 'hora_llegada': float(i), 'terminal_asignada': None}
+            siguiente_id += 1
+        elif accion < 0.7:
+            eid = rng.choice(list(estudiantes))
+            estudiantes[eid] = {'estado': 'UT', 'hora_llegada': estudiantes[eid]['hora_llegada'],
+                                'terminal_asignada': rng.randint(1, 4)}
+        elif accion < 0.95:
+            del estudiantes[rng.choice(list(estudiantes))]
+        estados.append({
+            'reloj': float(i),
+            'evento': rng.choice(['llegada_estudiante', 'fin_servicio', 'inicio_ronda']),
+            'cola_length': rng.randint(0, 5),
+            'tecnico': {'estado': rng.choice('DR'), 'fin_revision': ''},
+            'terminales': [{'estado': rng.choice('LO'), 'estudiante_id': ''} for _ in range(4)],
+            'rnd_usados': {'llegada_estudiante': rng.random()} if rng.random() < 0.5 else {},
+            'estudiantes': estudiantes,
+        })
+    return estados
+
+class PruebasTrazaDelta(unittest.TestCase):
+    def setUp(self):
+        self.lista = estados_sinteticos(500)
+        self.traza = TrazaDelta(intervalo_keyframe=7)
+        for estado in self.lista:
+            self.traza.append(estado)
+
+    def comprobar(self, traza):
+        self.assertEqual(len(traza), len(self.lista))
+        rng = random.Random(2)
+        for i in [rng.randrange(len(self.lista)) for _ in range(200)] + [0, len(self.lista) - 1]:
+            self.assertEqual(traza[i], self.lista[i])
+        for i in range(1, 20):
+            self.assertEqual(traza[-i], self.lista[-i])
+        for a, b, paso in [(0, 10, 1), (3, 50, 1), (480, 600, 1), (10, 200, 7), (-30, -5, 1), (None, None, None)]:
+            self.assertEqual(traza[a:b:paso], self.lista[a:b:paso])
+        for a, b in [(0, 500), (6, 7), (7, 8), (123, 321), (499, 500), (20, 10)]:
+            self.assertEqual(list(traza.iterar(a, b)), self.lista[a:b])
+        self.assertEqual(list(traza), self.lista)
+        with self.assertRaises(IndexError):
+            traza[len(self.lista)]
+
+    def test_igual_a_lista(self):
+        self.comprobar(self.traza)
+
+    def test_pickle(self):
+        self.traza[123]  # Deja un estado reconstruido en caché
+        self.comprobar(pickle.loads(pickle.dumps(self.traza)))
+
+    def test_agregar_cambios(self):
+        # Mismo contenido informando solo los cambios (como lo hace el simulador)
+        traza = TrazaDelta(intervalo_keyframe=7)
+        anteriores = {}
+        for estado in self.lista:
+            estudiantes = estado['estudiantes']
+            modificados = {eid: datos for eid, datos in estudiantes.items() if anteriores.get(eid) != datos}
+            eliminados = [eid for eid in anteriores if eid not in estudiantes]
+            traza.agregar_cambios({k: v for k, v in estado.items() if k != 'estudiantes'}, modificados, eliminados)
+            anteriores = estudiantes
+        self.comprobar(traza)
+
+    def test_lecturas_no_modifican_la_traza(self):
+        estado = self.traza[100]
+        estado['estudiantes'].clear()
+        estado['terminales'][0]['estado'] = 'X'
+        self.assertEqual(self.traza[100], self.lista[100])
+
+class PruebasTrazaSimulador(unittest.TestCase):
+    def test_estudiantes_del_simulador(self):
+        """Los estudiantes de cada estado de la traza son los del simulador en ese evento"""
+        instantaneas = []
+
+        class Simulador(SimuladorCertificados):
+            def guardar_estado_actual(self, evento):
+                super().guardar_estado_actual(evento)
+                instantaneas.append({eid: {'estado': e.estado, 'hora_llegada': e.hora_llegada,
+                                           'terminal_asignada': e.terminal_asignada}
+                                     for eid, e in self.estudiantes.items()})
+
+        simulador = Simulador(media_llegada=1.5)
+        simulador.rng = random.Random(3)
+        traza = simulador.simular(1500)['vector_estados']
+        self.assertEqual(len(traza), len(instantaneas))
+        for estado, estudiantes in zip(traza, instantaneas):
+            self.assertEqual(estado['estudiantes'], estudiantes)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+class TrazaDelta:
+    """
+    Vector de estados guardado como eventos: cada 'intervalo_keyframe' iteraciones se
+    guarda el estado completo y, en el resto, solo lo que cambió respecto de la iteración
+    anterior (claves del estado y estudiantes agregados, modificados o eliminados).
+    Así el tamaño crece con los cambios y no con (estudiantes en el sistema x eventos).
+
+    Se usa como una lista de estados: len(traza), traza[i], traza[-1], traza[a:b],
+    for estado in traza y traza.iterar(desde, hasta). Cada estado se reconstruye a
+    pedido desde el keyframe previo; las lecturas consecutivas aprovechan el último
+    estado reconstruido.
+    """
+    def __init__(self, intervalo_keyframe: int = 256):
+        self.intervalo_keyframe = intervalo_keyframe
+        self._keyframes: List[Dict] = []
+        # Por iteración: None si es keyframe, o (cambios, estudiantes_modificados, estudiantes_eliminados)
+        self._deltas: List[Optional[Tuple[Dict, Dict, List]]] = []
+        self._ultimo = None  # Último estado agregado, sin estudiantes (para calcular el próximo delta)
+        self._estudiantes: Dict = {}  # Estudiantes en el sistema tras el último estado agregado
+        self._reconstruido = None  # (iteración, estado) último reconstruido, privado de la traza
+
+    def append(self, estado: Dict):
+        """
+        Agrega el estado completo de la próxima iteración; los cambios de estudiantes se
+        calculan comparando con el anterior. El diccionario no debe modificarse después.
+        """
+        estudiantes = estado.get('estudiantes', {})
+        anteriores = self._estudiantes
+        modificados = {eid: datos for eid, datos in estudiantes.items() if anteriores.get(eid) != datos}
+        eliminados = [eid for eid in anteriores if eid not in estudiantes]
+        sin_estudiantes = {clave: valor for clave, valor in estado.items() if clave != 'estudiantes'}
+        self.agregar_cambios(sin_estudiantes, modificados, eliminados)
+
+    def agregar_cambios(self, estado: Dict, modificados: Dict, eliminados: List):
+        """
+        Agrega la próxima iteración cuando quien la genera ya sabe qué estudiantes cambiaron:
+        'estado' sin la clave 'estudiantes', los estudiantes nuevos o modificados (id -> datos)
+        y los ids que salieron del sistema. El costo depende de los cambios y no de la
+        cantidad de estudiantes (salvo en los keyframes). Nada de lo recibido debe
+        modificarse después.
+        """
+        estudiantes = self._estudiantes
+        # Se descartan los que en realidad no cambiaron, así los deltas son los mínimos
+        modificados = {eid: datos for eid, datos in modificados.items() if estudiantes.get(eid) != datos}
+        eliminados = [eid for eid in eliminados if eid in estudiantes]
+        for eid in eliminados:
+            del estudiantes[eid]
+        estudiantes.update(modificados)
+
+        if len(self._deltas) % self.intervalo_keyframe == 0:
+            completo = dict(estado)
+            completo['estudiantes'] = dict(estudiantes)
+            self._keyframes.append(completo)
+            self._deltas.append(None)
+        else:
+            anterior = self._ultimo
+            cambios = {clave: valor for clave, valor in estado.items()
+                       if clave not in anterior or anterior[clave] != valor}
+            self._deltas.append((cambios, modificados, eliminados))
+        self._ultimo = estado
+
+    def __len__(self) -> int:
+        return len(self._deltas)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("Iteración fuera del vector de estados")
+        return _copiar(self._reconstruir(indice))
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iterar()
+
+    def iterar(self, desde: int = 0, hasta: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Recorre los estados [desde, hasta) en orden, aplicando cada delta una sola vez
+        (arranca en el keyframe anterior a 'desde'). Los estados que entrega comparten los
+        valores internos que no cambiaron: son de solo lectura.
+        """
+        hasta = len(self) if hasta is None else min(hasta, len(self))
+        if desde >= hasta:
+            return
+        base = desde - desde % self.intervalo_keyframe
+        estado = None
+        for i in range(base, hasta):
+            delta = self._deltas[i]
+            if delta is None:
+                estado = _copiar(self._keyframes[i // self.intervalo_keyframe])
+            else:
+                estado = dict(estado)
+                estado['estudiantes'] = dict(estado['estudiantes'])
+                _aplicar(estado, delta)
+            if i >= desde:
+                yield estado
+
+    def _reconstruir(self, indice: int) -> Dict:
+        """Estado de la iteración indicada (objeto interno: no entregarlo sin copiar)"""
+        base = indice - indice % self.intervalo_keyframe
+        if self._reconstruido is not None and base <= self._reconstruido[0] <= indice:
+            desde, estado = self._reconstruido  # Se sigue desde el último reconstruido
+        else:
+            desde, estado = base, _copiar(self._keyframes[base // self.intervalo_keyframe])
+        for i in range(desde + 1, indice + 1):
+            _aplicar(estado, self._deltas[i])
+        self._reconstruido = (indice, estado)
+        return estado
+
+    def __getstate__(self):
+        # El estado reconstruido es solo una caché de lectura
+        estado = self.__dict__.copy()
+        estado['_reconstruido'] = None
+        return estado
+
+def _aplicar(estado: Dict, delta: Tuple[Dict, Dict, List]):
+    """Aplica un delta sobre un estado cuyo diccionario de estudiantes es propio"""
+    cambios, modificados, eliminados = delta
+    estado.update(cambios)
+    estudiantes = estado['estudiantes']
+    estudiantes.update(modificados)
+    for eid in eliminados:
+        del estudiantes[eid]
+
+def _copiar(estado: Dict) -> Dict:
+    """
+    Copia de un estado hasta el segundo nivel (terminales, técnico, estudiantes), que es
+    todo lo anidado que tiene; más rápido que copy.deepcopy
+    """
+    copia = {}
+    for clave, valor in estado.items():
+        if isinstance(valor, dict):
+            copia[clave] = {k: (v.copy() if isinstance(v, (dict, list)) else v) for k, v in valor.items()}
+        elif isinstance(valor, list):
+            copia[clave] = [(v.copy() if isinstance(v, (dict, list)) else v) for v in valor]
+        else:
+            copia[clave] = valor
+    return copia